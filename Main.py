@@ -1,11 +1,27 @@
 import sys
-from PySide6.QtCore import QUrl, QObject, Slot, Signal, Property, QAbstractListModel, Qt, QModelIndex
+from PySide6.QtCore import QUrl, QObject, Slot, Signal, Property, QAbstractListModel, Qt, QModelIndex, QFileSystemWatcher, QTimer, QRunnable, QThreadPool
 from PySide6.QtQml import QQmlApplicationEngine
 from PySide6.QtWidgets import QApplication
 from PySide6.QtQml import QmlElement
 import os
-from backend.Tasks import create_task, expand_step, combine_steps, delete_step, log_time, add_context, add_step, move_task, move_tasks_category, move_step, set_tasks_file
-from backend.Graph import graph_nodes_creation
+import uuid
+from backend.Tasks import delete_step, log_time, move_task, move_tasks_category, move_step, move_step_by_id, set_tasks_file
+from backend.Tasks import (
+    request_completion, stream_completion, needs_retry,
+    prepare_create_task, apply_create_task, apply_create_task_event, insert_placeholder_task,
+    prepare_expand_step, apply_expand_step, apply_expand_step_event,
+    prepare_expand_steps, apply_expand_steps, prepare_prefetch_expansions,
+    prepare_combine_steps, apply_combine_steps,
+    prepare_add_step, apply_add_step,
+    prepare_add_context, apply_add_context,
+)
+from backend.Graph import graph_nodes_creation, get_activity_cache, add_activity_listener
+from backend.TaskStore import get_store, reload_changed_stores
+from backend.Journal import journal_path
+from backend.Writer import get_writer
+from backend.OfflineQueue import get_queue
+from backend.LLM_API import has_cached_response, CONNECTION_EXCEPTIONS, CONNECTION_ERROR_PREFIX
+from backend.LLMCache import get_cache
 import json 
 import pandas as pd
 from datetime import date, datetime
@@ -18,6 +34,7 @@ Constants:
 QML_IMPORT_NAME (str): QML module identifier.
 QML_IMPORT_MAJOR_VERSION (int): Major version of the QML module.
 BASE_DIR (str): The root path of the application, adjusted for PyInstaller bundling.
+DATA_DIR (str): Directory holding the task datasets, watched for external edits.
 TASK_FILES (list): List of JSON file paths for different task datasets.
 TITLE_IMAGES (list): List of image file paths for application titles.
 """
@@ -32,6 +49,8 @@ else:
     # Running normally (script)
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
 TASK_FILES = [
     os.path.join(BASE_DIR, "data", "Prism_Task_Data.json"),
     os.path.join(BASE_DIR, "data", "LeJarvis_Task_Data.json"),
@@ -48,6 +67,297 @@ TITLE_IMAGES = [
     "./images/Masters_title.png"
 ]
 
+# Apply functions for requests sent again from the offline queue (never streamed)
+_APPLY_FUNCTIONS = {
+    "create_task": apply_create_task,
+    "expand_step": apply_expand_step,
+    "expand_steps": apply_expand_steps,
+    "combine_steps": apply_combine_steps,
+    "add_step": apply_add_step,
+    "add_context": apply_add_context,
+}
+
+
+class _LLMJobSignals(QObject):
+    """Signals a worker uses to hand its result back to the GUI thread."""
+    progress = Signal(str, object)
+    done = Signal(str, object)
+    error = Signal(str, str)
+
+
+class _LLMJob(QRunnable):
+    """Runs one prepared LLM request on a QThreadPool worker thread."""
+
+    def __init__(self, handle, request, stream=False):
+        super().__init__()
+        self.handle = handle
+        self.request = request
+        self.stream = stream
+        self.signals = _LLMJobSignals()
+
+    def run(self):
+        try:
+            if self.stream:
+                # Hand each parsed part over as soon as it is complete
+                for event in stream_completion(self.request):
+                    if event[0] == "done":
+                        self.signals.done.emit(self.handle, event)
+                    else:
+                        self.signals.progress.emit(self.handle, event)
+                return
+            response = request_completion(self.request)
+        except CONNECTION_EXCEPTIONS as e:
+            # Reported like a failed call so the request is retried later
+            self.signals.error.emit(self.handle, f"{CONNECTION_ERROR_PREFIX} {e}")
+            return
+        except Exception as e:
+            self.signals.error.emit(self.handle, str(e))
+            return
+        self.signals.done.emit(self.handle, response)
+
+
+class LLMRequests(QObject):
+    """
+    Dispatches LLM-backed operations to a thread pool so the GUI keeps running.
+
+    An operation is prepared on the GUI thread (resolving the task and building the
+    prompt), the completion call runs on a worker thread, and the response is
+    applied to the task store back on the GUI thread once it lands. Streamed
+    requests apply each parsed part of the response as it arrives.
+
+    Every request is recorded in the offline queue (see OfflineQueue.py) until its
+    response has been applied. When the API cannot be reached, the request stays
+    queued and is sent again after a growing delay, or right away once another
+    request gets through; requests left from the last session are sent at start-up.
+
+    Signals:
+        requestStarted(handle, operation): The request was queued.
+        requestProgress(handle, operation): Part of a streamed response was applied.
+        requestFinished(handle, operation): The response was applied.
+        requestFailed(handle, operation, error): The call or applying its response failed.
+        requestDeferred(handle, operation, seconds): The API could not be reached;
+            the request will be sent again after the given delay.
+    """
+    requestStarted = Signal(str, str)
+    requestProgress = Signal(str, str)
+    requestFinished = Signal(str, str)
+    requestFailed = Signal(str, str, str)
+    requestDeferred = Signal(str, str, float)
+
+    def __init__(self, parent=None, queue=None):
+        super().__init__(parent)
+        self._pool = QThreadPool.globalInstance()
+        self._pending = {}  # handle -> (request, apply function, job, queue entry ID)
+        self._held = set()  # queue entries whose response could not be applied; sent again next session
+        self._queue = queue if queue is not None else get_queue()
+
+        # Sends deferred requests again once their retry delay has passed
+        self._retry_timer = QTimer(self)
+        self._retry_timer.setSingleShot(True)
+        self._retry_timer.timeout.connect(self.drainQueue)
+        if len(self._queue):
+            # Requests left over from the last session
+            QTimer.singleShot(0, self.drainQueue)
+
+    def submit(self, request, apply, stream=False, entry_id=None):
+        """
+        Start a prepared request.
+
+        Parameters:
+        request (dict or None): Request from a Tasks.prepare_* function.
+        apply (callable): The matching Tasks.apply_* function, or the
+            apply_*_event function when streaming.
+        stream (bool): Stream the response and apply it part by part.
+        entry_id (str or None): Offline queue entry of a request being sent again;
+            new requests are added to the queue.
+
+        Returns:
+        str: Handle identifying the request in the signals, or "" if there was nothing to send.
+        """
+        if request is None:
+            return ""
+
+        if entry_id is None:
+            entry_id = self._queue.add(request)
+
+        handle = uuid.uuid4().hex[:12]
+        job = _LLMJob(handle, request, stream)
+        job.signals.progress.connect(self._onProgress)
+        job.signals.done.connect(self._onDone)
+        job.signals.error.connect(self._onError)
+        self._pending[handle] = (request, apply, job, entry_id)
+
+        self.requestStarted.emit(handle, request["operation"])
+        self._pool.start(job)
+        return handle
+
+    @Slot(result=int)
+    def pendingCount(self):
+        """Return the number of requests still waiting for a response."""
+        return len(self._pending)
+
+    @Slot(result=int)
+    def queuedCount(self):
+        """Return the number of requests not yet applied, including deferred ones."""
+        return len(self._queue)
+
+    @Slot()
+    def drainQueue(self, force=False):
+        """
+        Send the queued requests that are due and not already in flight.
+
+        Parameters:
+        force (bool): Send every waiting request regardless of its retry delay.
+        """
+        for entry in self._queue.due(force=force, exclude=self._excluded()):
+            request = entry["request"]
+            apply = _APPLY_FUNCTIONS.get(request.get("operation"))
+            if apply is None:
+                print(f"Error: Dropping queued request with unknown operation {request.get('operation')!r}")
+                self._queue.remove(entry["id"])
+                continue
+            self.submit(request, apply, entry_id=entry["id"])
+        self._scheduleRetry()
+
+    def _excluded(self):
+        """Return the queue entries not to send now: those in flight and those held back."""
+        return {entry_id for _, _, _, entry_id in self._pending.values()} | self._held
+
+    def _scheduleRetry(self):
+        """Start the retry timer for the earliest deferred request, if any."""
+        delay = self._queue.next_due(exclude=self._excluded())
+        if delay is None:
+            self._retry_timer.stop()
+        else:
+            self._retry_timer.start(int(delay * 1000))
+
+    def _onProgress(self, handle, event):
+        request, apply, _, _ = self._pending[handle]
+        try:
+            apply(request, event)
+        except Exception as e:
+            print(f"Error: Could not apply streamed {request['operation']} result: {e}")
+            return
+        self.requestProgress.emit(handle, request["operation"])
+
+    def _onDone(self, handle, response):
+        request, apply, _, entry_id = self._pending.pop(handle)
+
+        # Streamed requests finish with a ("done", result) event
+        result = response[1] if isinstance(response, tuple) else response
+        if needs_retry(result):
+            if isinstance(response, tuple):
+                # Take back the parts of the streamed response that were already applied
+                try:
+                    apply(request, response)
+                except Exception as e:
+                    print(f"Error: Could not undo streamed {request['operation']} result: {e}")
+            error = result["error"] if isinstance(result, dict) else "Could not reach the API"
+            delay = self._queue.defer(entry_id, error)
+            print(f"API unreachable; {request['operation']} queued for another attempt in {delay:.0f} s")
+            self.requestDeferred.emit(handle, request["operation"], delay)
+            self._scheduleRetry()
+            return
+
+        try:
+            applied = apply(request, response)
+        except Exception as e:
+            # Keep the request queued so it is not lost, but don't resend it this session
+            self._held.add(entry_id)
+            self.requestFailed.emit(handle, request["operation"], str(e))
+            return
+        # Only now is the request done with; a crash before this point leaves it queued
+        self._queue.remove(entry_id)
+        if self._queue.due(force=True, exclude=self._excluded()):
+            # The API is reachable again; send what was waiting for it
+            self.drainQueue(force=True)
+
+        if applied:
+            self.requestFinished.emit(handle, request["operation"])
+        else:
+            self.requestFailed.emit(handle, request["operation"], "The response could not be applied")
+
+    def _onError(self, handle, error):
+        request, _, job, _ = self._pending[handle]
+        # Finish with a failed result, so the request is retried or dropped like any failed call
+        failure = {"data": None, "error": error}
+        if "requests" in request:
+            failure = [failure] * len(request["requests"])
+        self._onDone(handle, ("done", failure) if job.stream else failure)
+
+
+class ExpansionPrefetcher(QObject):
+    """
+    Expands the steps of the selected dev task in the background, ahead of a click.
+
+    Expansions only go into the response cache; the task is not changed. Clicking
+    "Expand" on a prefetched step then applies the cached response at once.
+
+    Prefetching is opt-in (PRISM_PREFETCH=on) and needs the response cache. It
+    starts once the selection has been left alone for IDLE_DELAY_MS, sends one
+    request at a time, and waits while any user-initiated request is running.
+    Each project may spend at most PRISM_PREFETCH_BUDGET API calls per session
+    on prefetching (20 by default).
+    """
+    IDLE_DELAY_MS = 1500
+    MAX_STEPS = 8  # Steps of the selected task worth prefetching
+
+    def __init__(self, llm_requests, parent=None):
+        super().__init__(parent)
+        self.enabled = os.environ.get("PRISM_PREFETCH", "off").lower() in ("on", "1", "true")
+        self.budget = int(os.environ.get("PRISM_PREFETCH_BUDGET", "20"))
+        self._llm_requests = llm_requests
+        self._pool = QThreadPool.globalInstance()
+        self._waiting = []  # requests for the current selection, not yet sent
+        self._job = None    # the prefetch in flight
+        self._spent = {}    # tasks file -> API calls spent on prefetching
+
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.setInterval(self.IDLE_DELAY_MS)
+        self._idle_timer.timeout.connect(self._prefetchNext)
+
+    def prefetch(self, task_id):
+        """
+        Prefetch the expansions of a task's steps, replacing any earlier selection.
+
+        Parameters:
+        task_id (str): Persistent ID of the selected dev task.
+        """
+        if not self.enabled or get_cache() is None:
+            return
+        self._waiting = prepare_prefetch_expansions(task_id, self.MAX_STEPS)
+        self._idle_timer.start()
+
+    def _prefetchNext(self):
+        if self._job is not None:
+            return
+        if self._llm_requests.pendingCount():
+            # Leave the network to the user's own requests
+            self._idle_timer.start()
+            return
+
+        while self._waiting:
+            request = self._waiting.pop(0)
+            spent = self._spent.get(request["tasks_file"], 0)
+            if spent >= self.budget:
+                self._waiting = []
+                return
+            if has_cached_response(request["input"], request["rule"]):
+                continue
+
+            self._spent[request["tasks_file"]] = spent + 1
+            self._job = _LLMJob("prefetch", request)
+            self._job.signals.done.connect(self._onDone)
+            self._job.signals.error.connect(self._onDone)
+            self._pool.start(self._job, -1)
+            return
+
+    def _onDone(self, *args):
+        self._job = None
+        self._idle_timer.start()
+
+
 @QmlElement
 class MenuBackend(QObject):
     """
@@ -57,47 +367,174 @@ class MenuBackend(QObject):
     - Filters tasks into categories: 'idea', 'dev', and 'rlty'.
     - Initializes the submenu with steps from the first development task.
     - Sets the default selected menu index.
+    - Watches the data directory so edits made by other tools show up immediately.
+    - Refreshes the menus whenever an LLM request's result has been applied.
+    - Optionally prefetches step expansions of the selected dev task (see ExpansionPrefetcher).
 
     Signals:
-        menuItemsChanged: Emitted when top-level menu items are updated.
+        menuItemsChanged: Emitted when the project or selection changes.
+        ideaMenuItemsChanged, devMenuItemsChanged, rltyMenuItemsChanged:
+            Emitted when that category's task list is updated.
         submenuItemsChanged: Emitted when submenu items change.
     """
     menuItemsChanged = Signal()
+    ideaMenuItemsChanged = Signal()
+    devMenuItemsChanged = Signal()
+    rltyMenuItemsChanged = Signal()
     submenuItemsChanged = Signal()
 
-    def __init__(self):
+    def __init__(self, llm_requests=None):
         super().__init__()
+        self._llm_requests = llm_requests or LLMRequests(self)
+        # Results land at any time; refresh without moving the user's selection
+        self._llm_requests.requestFinished.connect(self._onRequestProgress)
+        self._llm_requests.requestProgress.connect(self._onRequestProgress)
+        # New requests may add placeholder tasks
+        self._llm_requests.requestStarted.connect(self._onRequestProgress)
+        # Failed and deferred requests may have blanked a placeholder or taken back streamed steps
+        self._llm_requests.requestFailed.connect(lambda handle, operation, reason: self._onRequestProgress(handle, operation))
+        self._llm_requests.requestDeferred.connect(lambda handle, operation, delay: self._onRequestProgress(handle, operation))
+        self._prefetcher = ExpansionPrefetcher(self._llm_requests, self)
         self._task_index = 0  # Track which file is currently active
         self._tasks_file = TASK_FILES[self._task_index]
 
-        all_tasks = self.loadTasks()
-        self._idea_menu_items = [item for item in all_tasks if item.get("category") == "idea"]
-        self._dev_menu_items = [item for item in all_tasks if item.get("category") == "dev"]
-        self._rlty_menu_items = [item for item in all_tasks if item.get("category") == "rlty"]
+        # tasks file -> (store, store version, idea, dev, rlty lists)
+        self._menu_cache = {}
+        self._idea_menu_items, self._dev_menu_items, self._rlty_menu_items = self.categorizedTasks()
 
         # Default submenu and selection
         self._submenu_items = self._dev_menu_items[0]["steps"] if self._dev_menu_items else []
+        self._submenu_task_id = self._dev_menu_items[0]["id"] if self._dev_menu_items else None
         self._selected_menu_index = 0
 
+        # Watch the data directory and project files; bursts of change
+        # notifications (a sync client replacing a file) are handled once
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(200)
+        self._reload_timer.timeout.connect(self.reloadExternalChanges)
+
+        self._watcher = QFileSystemWatcher(self)
+        if os.path.isdir(DATA_DIR):
+            self._watcher.addPath(DATA_DIR)
+        self._watchTaskFiles()
+        self._watcher.fileChanged.connect(lambda path: self._reload_timer.start())
+        self._watcher.directoryChanged.connect(lambda path: self._reload_timer.start())
+
+    def _watchTaskFiles(self):
+        """
+        Watch every existing project file and journal.
+
+        Files replaced by rename drop out of the watcher, so this is repeated
+        after each change notification.
+        """
+        watched = set(self._watcher.files())
+        paths = [
+            path
+            for tasks_file in TASK_FILES
+            for path in (tasks_file, journal_path(tasks_file))
+            if path not in watched and os.path.exists(path)
+        ]
+        if paths:
+            self._watcher.addPaths(paths)
+
+    @Slot()
+    def reloadExternalChanges(self):
+        """
+        Pick up project files edited outside the app.
+
+        Only projects already loaded and actually changed on disk are reloaded.
+        For the current project, the new contents are diffed against the lists
+        on screen and only the changed categories' signals are emitted.
+        """
+        self._watchTaskFiles()
+        changed = reload_changed_stores().get(self._tasks_file)
+        if not changed:
+            return
+
+        # Take all three lists so none keeps pointing at the replaced task dicts
+        self._idea_menu_items, self._dev_menu_items, self._rlty_menu_items = self.categorizedTasks()
+        if "dev" in changed:
+            if not 0 <= self._selected_menu_index < len(self._dev_menu_items):
+                self._selected_menu_index = 0
+            self._submenu_items = (
+                self._dev_menu_items[self._selected_menu_index]["steps"]
+                if self._dev_menu_items else []
+            )
+            self._submenu_task_id = (
+                self._dev_menu_items[self._selected_menu_index]["id"]
+                if self._dev_menu_items else None
+            )
+        self._emitCategoriesChanged(changed)
+        if "dev" in changed:
+            self.submenuItemsChanged.emit()
+
+    def _onRequestProgress(self, handle, operation):
+        """
+        Show applied or streamed results without resetting the selection.
+
+        The menu lists are re-read from the store and the open submenu is pointed
+        at the current step list of the task it shows. Only if that task is gone
+        does the submenu move to the dev task now at the selected index.
+        """
+        self._idea_menu_items, self._dev_menu_items, self._rlty_menu_items = self.categorizedTasks()
+        task = get_store(self._tasks_file).get(self._submenu_task_id) if self._submenu_task_id else None
+        if task is None and self._dev_menu_items:
+            if not 0 <= self._selected_menu_index < len(self._dev_menu_items):
+                self._selected_menu_index = 0
+            task = self._dev_menu_items[self._selected_menu_index]
+            self._submenu_task_id = task["id"]
+        if task is not None:
+            self._submenu_items = task["steps"]
+        self._emitCategoriesChanged(("idea", "dev", "rlty"))
+        self.submenuItemsChanged.emit()
+
+    def _emitCategoriesChanged(self, categories):
+        """Emit the change signal of each given category."""
+        signals = {
+            "idea": self.ideaMenuItemsChanged,
+            "dev": self.devMenuItemsChanged,
+            "rlty": self.rltyMenuItemsChanged,
+        }
+        for category in categories:
+            if category in signals:
+                signals[category].emit()
+
 
     def loadTasks(self):
         """
         Load tasks from the currently selected JSON file.
 
         Returns:
-            list: A list of task dictionaries loaded from the JSON file.
+            list: The full task list held by the project's TaskStore.
                 Returns an empty list if the file doesn't exist, is empty, or is corrupted.
         """
-
-        if os.path.exists(self._tasks_file):
-            with open(self._tasks_file, "r", encoding="utf-8") as file:
-                try:
-                    tasks = json.load(file)  # Load existing tasks
-                    return tasks if isinstance(tasks, list) else []
-                except json.JSONDecodeError:
-                    return []  # If file is empty or corrupted, return empty list
-        return []
+        return get_store(self._tasks_file).tasks
     
+    def categorizedTasks(self):
+        """
+        Return the current project's tasks split into categories.
+
+        The lists are cached per project and reused as long as the project's
+        TaskStore has not changed, so switching back to a project needs no
+        re-categorization.
+
+        Returns:
+            tuple: The (idea, dev, rlty) task lists.
+        """
+        store = get_store(self._tasks_file)
+        cached = self._menu_cache.get(self._tasks_file)
+        if cached is None or cached[0] is not store or cached[1] != store.version:
+            cached = (
+                store,
+                store.version,
+                store.category("idea"),
+                store.category("dev"),
+                store.category("rlty"),
+            )
+            self._menu_cache[self._tasks_file] = cached
+        return cached[2:]
+
     def getMenuListbyCategory(self, category):
         """
         Retrieve the list of menu items based on the provided category.
@@ -158,33 +595,34 @@ class MenuBackend(QObject):
         category (str): The category name ('idea', 'dev', or 'rlty').
 
         Returns:
-        dict: A dictionary with 'title' and 'description' of the selected menu item, or empty strings if the index is out of range.
+        dict: A dictionary with 'id', 'title' and 'description' of the selected menu item, or empty strings if the index is out of range.
         """
         menu_list = self.getMenuListbyCategory(category)
         if 0 <= self._selected_menu_index < len(menu_list):
             selected_menu = menu_list[self._selected_menu_index]
             return {
+                "id": selected_menu["id"],
                 "title": selected_menu["title"],
                 "description": selected_menu["description"]
             }
-        return {"title": "", "description": ""}
+        return {"id": "", "title": "", "description": ""}
 
     @Property(int, notify=menuItemsChanged)
     def selectedMenuIndex(self):
         """Return the index of the selected menu item."""
         return self._selected_menu_index
 
-    @Property(list, notify=menuItemsChanged)
+    @Property(list, notify=ideaMenuItemsChanged)
     def IdeaMenuItems(self):
         """Expose menu items as a property to QML."""
         return self._idea_menu_items
     
-    @Property(list, notify=menuItemsChanged)
+    @Property(list, notify=devMenuItemsChanged)
     def DevMenuItems(self):
         """Expose menu items as a property to QML."""
         return self._dev_menu_items
     
-    @Property(list, notify=menuItemsChanged)
+    @Property(list, notify=rltyMenuItemsChanged)
     def RltyMenuItems(self):
         """Expose menu items as a property to QML."""
         return self._rlty_menu_items
@@ -206,25 +644,26 @@ class MenuBackend(QObject):
 
         if 0 <= index < len(target_list):
             self._submenu_items = target_list[index]["steps"]
+            self._submenu_task_id = target_list[index]["id"]
             self.submenuItemsChanged.emit()
+            if category == "dev":
+                self._prefetcher.prefetch(self._submenu_task_id)
 
 
     @Slot()
     def refreshMenu(self):
-        """Reload tasks from file and update categorized lists."""
-        all_tasks = self.loadTasks()
-        self._menu_items = all_tasks  # Optional: keep for backward compatibility
-        # Categorize tasks
-        self._idea_menu_items = [task for task in all_tasks if task.get("category") == "idea"]
-        self._dev_menu_items = [task for task in all_tasks if task.get("category") == "dev"]
-        self._rlty_menu_items = [task for task in all_tasks if task.get("category") == "rlty"]
+        """Refresh the categorized lists from the project's TaskStore."""
+        self._idea_menu_items, self._dev_menu_items, self._rlty_menu_items = self.categorizedTasks()
+        self._menu_items = get_store(self._tasks_file).tasks  # Optional: keep for backward compatibility
         # Reset submenu to first item in each, if needed
         self._selected_menu_index = 0
         self._submenu_items = (
             self._dev_menu_items[0]["steps"]
             if self._dev_menu_items else []
         )
+        self._submenu_task_id = self._dev_menu_items[0]["id"] if self._dev_menu_items else None
         self.menuItemsChanged.emit()
+        self._emitCategoriesChanged(("idea", "dev", "rlty"))
         self.submenuItemsChanged.emit()
 
     @Slot(int, int, str)
@@ -247,6 +686,18 @@ class MenuBackend(QObject):
         move_tasks_category(fromCategory, index, toCategory)
         self.refreshMenu()
 
+    @Slot(str, str)
+    def moveTaskToCategoryById(self, taskId, toCategory):
+        """Move the task with the given ID to another category and refresh the menu."""
+        store = get_store(self._tasks_file)
+        task = store.get(taskId)
+        if task is None:
+            print(f"Task '{taskId}' not found.")
+            return
+        index = store.category(task["category"]).index(task)
+        move_tasks_category(task["category"], index, toCategory)
+        self.refreshMenu()
+
     @Slot(int, int)
     def moveStep(self, from_index, to_index):
         """
@@ -265,41 +716,103 @@ class MenuBackend(QObject):
         )
         self.refreshMenu()
 
-    @Slot(list, str, str)
+    @Slot(str, int)
+    def moveStepById(self, stepId, to_index):
+        """
+        Move the step with the given ID to a new index within its task and refresh the menu.
+
+        Parameters:
+        stepId (str): Persistent ID of the step to move.
+        to_index (int): The target index within the task's steps.
+        """
+        move_step_by_id(stepId, to_index)
+        self.refreshMenu()
+
+    @Slot(list, str, str, result=str)
     def combineSteps(self, stepDescriptions, parentTitle, parentDescription):  
         """
-        Combine multiple steps into a single parent step and refresh the menu.
+        Combine multiple steps into a single parent step in the background.
 
         Parameters:
         stepDescriptions (list of str): Descriptions of the steps to combine.
         parentTitle (str): Title of the new combined step.
         parentDescription (str): Description of the new combined step.
+
+        Returns:
+        str: Request handle; the menu refreshes when the result is applied.
         """
         steps_data = {
             "title": parentTitle,
             "description": parentDescription,
             "steps_to_combine": stepDescriptions 
         }
-        combine_steps(steps_data)
-        self.refreshMenu()
+        return self._llm_requests.submit(prepare_combine_steps(steps_data), apply_combine_steps)
 
-    @Slot(str, str, str)
+    @Slot(list, str, result=str)
+    def combineStepsById(self, stepIds, taskId):
+        """
+        Combine the steps with the given IDs into a single step in the background.
+
+        Parameters:
+        stepIds (list of str): Persistent IDs of the steps to combine.
+        taskId (str): Persistent ID of the task owning the steps.
+
+        Returns:
+        str: Request handle; the menu refreshes when the result is applied.
+        """
+        request = prepare_combine_steps({"task_id": taskId, "step_ids": stepIds})
+        return self._llm_requests.submit(request, apply_combine_steps)
+
+    @Slot(str, str, str, result=str)
     def expandStep(self, stepDescription, parentTitle, parentDescription):
         """
-        Expand a single step into multiple sub-steps and refresh the menu.
+        Expand a single step into multiple sub-steps in the background.
 
         Parameters:
         stepDescription (str): Description of the step to expand.
         parentTitle (str): Title of the parent step.
         parentDescription (str): Description of the parent step.
+
+        Returns:
+        str: Request handle; the menu refreshes when the result is applied.
         """
         step_data = {
         "title": parentTitle,
         "description": parentDescription,
         "step_to_expand": stepDescription
         }
-        expand_step(step_data)
-        self.refreshMenu()
+        return self._llm_requests.submit(prepare_expand_step(step_data), apply_expand_step_event, stream=True)
+
+    @Slot(str, result=str)
+    def expandStepById(self, stepId):
+        """
+        Expand the step with the given ID into multiple sub-steps in the background.
+
+        Sub-steps are streamed into the submenu as they arrive.
+
+        Parameters:
+        stepId (str): Persistent ID of the step to expand.
+
+        Returns:
+        str: Request handle; the menu refreshes when the result is applied.
+        """
+        return self._llm_requests.submit(prepare_expand_step({"step_id": stepId}), apply_expand_step_event, stream=True)
+
+    @Slot(list, str, result=str)
+    def expandStepsById(self, stepIds, taskId):
+        """
+        Expand several steps of a task at once in the background.
+
+        The requests run concurrently and all results are saved in one write.
+
+        Parameters:
+        stepIds (list of str): Persistent IDs of the steps to expand.
+        taskId (str): Persistent ID of the task owning the steps.
+
+        Returns:
+        str: Request handle; the menu refreshes when the results are applied.
+        """
+        return self._llm_requests.submit(prepare_expand_steps(taskId, stepIds), apply_expand_steps)
 
     @Slot(str, str, str)
     def deleteStep(self, stepDescription, parentTitle, parentDescription):
@@ -319,6 +832,17 @@ class MenuBackend(QObject):
         delete_step(step_data)
         self.refreshMenu()
 
+    @Slot(str)
+    def deleteStepById(self, stepId):
+        """
+        Delete the step with the given ID and refresh the menu.
+
+        Parameters:
+        stepId (str): Persistent ID of the step to delete.
+        """
+        delete_step({"step_id": stepId})
+        self.refreshMenu()
+
     @Slot(str, int, str, str)
     def recordStepTime(self, stepDescription, seconds, parentTitle, parentDescription):
         """
@@ -339,25 +863,55 @@ class MenuBackend(QObject):
             }
         print(step_data)
         log_time(step_data)
+
+    @Slot(str, int)
+    def recordStepTimeById(self, stepId, seconds):
+        """
+        Record the time spent on the step with the given ID.
+
+        Parameters:
+        stepId (str): Persistent ID of the step to record time for.
+        seconds (int): Duration in seconds to log.
+        """
+        log_time({
+            "project": self._tasks_file,
+            "step_id": stepId,
+            "duration": seconds
+            })
     
 
 
 class Input(QObject):
-    """Initialize the Input class, a QObject subclass."""
-    def __init__(self):  # Accept external instance
-        super().__init__()# Store reference
+    """
+    Initialize the Input class, a QObject subclass.
 
-    @Slot(str)
+    Every slot starts an LLM request in the background and returns its handle;
+    progress is reported through the shared LLMRequests signals.
+    """
+    def __init__(self, llm_requests=None):  # Accept external instance
+        super().__init__()
+        self._llm_requests = llm_requests or LLMRequests(self)  # Store reference
+
+    @Slot(str, result=str)
     def processTaskInput(self, text):
         """
         Process a raw task input string and create a new task.
 
+        A placeholder titled with the text appears in the Ideas menu at once,
+        even while offline, and is filled in as the steps stream in.
+
         Parameters:
         text (str): The raw task text to be processed and added.
+
+        Returns:
+        str: Request handle, or "" if the same text is already waiting for a response.
         """
-        create_task(text)
+        request = prepare_create_task(text)
+        if insert_placeholder_task(request) is None:
+            return ""
+        return self._llm_requests.submit(request, apply_create_task_event, stream=True)
 
-    @Slot(str, int)
+    @Slot(str, int, result=str)
     def processContextInput(self, text, index):
         """
         Add contextual information to a specific task based on user input.
@@ -365,10 +919,13 @@ class Input(QObject):
         Parameters:
         text (str): The context text to add.
         index (int): The index of the task to which the context will be added.
+
+        Returns:
+        str: Request handle.
         """
-        add_context(text, index)
+        return self._llm_requests.submit(prepare_add_context(text, index), apply_add_context)
 
-    @Slot(str, int)
+    @Slot(str, int, result=str)
     def processStepInput(self, text, index):
         """
         Add a new step to a task based on user input.
@@ -376,19 +933,60 @@ class Input(QObject):
         Parameters:
         text (str): The step text to add.
         index (int): The index of the task to which the step will be added.
+
+        Returns:
+        str: Request handle.
+        """
+        return self._llm_requests.submit(prepare_add_step(text, index), apply_add_step)
+
+    @Slot(str, str, result=str)
+    def processContextInputById(self, text, taskId):
         """
-        add_step(text, index)
+        Add contextual information to the task with the given ID.
+
+        Parameters:
+        text (str): The context text to add.
+        taskId (str): Persistent ID of the task to update.
+
+        Returns:
+        str: Request handle.
+        """
+        return self._llm_requests.submit(prepare_add_context(text, task_id=taskId), apply_add_context)
+
+    @Slot(str, str, result=str)
+    def processStepInputById(self, text, taskId):
+        """
+        Add a new step to the task with the given ID.
+
+        Parameters:
+        text (str): The step text to add.
+        taskId (str): Persistent ID of the task to extend.
+
+        Returns:
+        str: Request handle.
+        """
+        return self._llm_requests.submit(prepare_add_step(text, task_id=taskId), apply_add_step)
 
 class NodeModel(QAbstractListModel):
     XRole = Qt.ItemDataRole.UserRole + 1
     YRole = Qt.ItemDataRole.UserRole + 2
     LabelRole = Qt.ItemDataRole.UserRole + 3
     nodesChanged = Signal()
+    activityLogged = Signal(str, object)
 
     def __init__(self, df=None, parent=None):
         super().__init__(parent)
         self.df = df  # Raw activity DataFrame
         self._nodes = []
+        self._project = None
+        self._range = None
+
+        # Time is logged on whichever thread recorded it; patch the nodes on ours
+        self.activityLogged.connect(self._onActivityLogged)
+        add_activity_listener(self._publishActivity)
+
+    def _publishActivity(self, project, timestamp):
+        self.activityLogged.emit(project, timestamp)
     
     def update_nodes(self, nodes):
         self.beginResetModel()
@@ -404,11 +1002,11 @@ class NodeModel(QAbstractListModel):
             return None
         node = self._nodes[index.row()]
         if role == self.XRole:
-            return node['x']
+            return node.x
         elif role == self.YRole:
-            return node['y']
+            return node.y
         elif role == self.LabelRole:
-            return node['label']
+            return node.label
         return None
 
     def roleNames(self):
@@ -423,13 +1021,44 @@ class NodeModel(QAbstractListModel):
         start_date = datetime(start_qdate.year(), start_qdate.month(), start_qdate.day())
         end_date = datetime(end_qdate.year(), end_qdate.month(), end_qdate.day())
         print(start_date, end_date)
-        nodes = graph_nodes_creation(start_date, end_date, 'Prism')
-        self.update_nodes(nodes)
+        self.show_range(start_date, end_date, 'Prism')
+
+    def show_range(self, start_date, end_date, project):
+        """
+        Show a project's activity over a date range.
+
+        Parameters:
+        start_date (datetime): First visible day.
+        end_date (datetime): Last visible day.
+        project (str): Project name, e.g. 'Prism'.
+        """
+        self._project = project
+        self._range = (start_date, end_date)
+        self.update_nodes(graph_nodes_creation(start_date, end_date, project))
+
+    @Slot(str, object)
+    def _onActivityLogged(self, project, timestamp):
+        """Update the bucket holding newly logged time, leaving the other nodes in place."""
+        if project != self._project or not self._nodes:
+            return
+        start_date, end_date = self._range
+        # The entry was already added to the cached rollup; don't make the writer flush for it
+        activity = get_activity_cache().peek(project)
+        if activity is None:
+            self.show_range(start_date, end_date, project)
+            return
+        changed = activity.update_bucket(self._nodes, start_date, end_date, timestamp)
+        if not changed:
+            return
+        self.dataChanged.emit(self.index(changed[0]), self.index(changed[-1]), [self.YRole])
+        self.nodesChanged.emit()
 
     @Slot(int, result='QVariant')
     def get(self, index):
+        # Only what QML draws crosses over; the rest stays on the Python side
         if 0 <= index < len(self._nodes):
-            return self._nodes[index]
+            node = self._nodes[index]
+            return {'x': node.x, 'y': node.y, 'label': node.label}
         return None
 
     @Property(int, constant=True)
@@ -440,7 +1069,7 @@ class NodeModel(QAbstractListModel):
     def scaledMaxY(self):
         if not self._nodes:
             return 0
-        raw_max = max(node['y'] for node in self._nodes) * 1.1
+        raw_max = max(node.y for node in self._nodes) * 1.1
         print(raw_max)
         return math.ceil(raw_max / 10) * 10
 
@@ -477,8 +1106,9 @@ if __name__ == "__main__":
 
         
         # Register the Input class as a context property
-        menu_backend = MenuBackend()  # Menu backend
-        input_backend = Input()
+        llm_requests = LLMRequests()  # Background LLM calls shared by both backends
+        menu_backend = MenuBackend(llm_requests)  # Menu backend
+        input_backend = Input(llm_requests)
         #node_model = NodeModel()
         node_model = NodeModel()
         
@@ -487,14 +1117,13 @@ if __name__ == "__main__":
         engine.rootContext().setContextProperty("submenuBackend", menu_backend)
         engine.rootContext().setContextProperty("inputBackend", input_backend)
         engine.rootContext().setContextProperty("nodeModel", node_model)
+        engine.rootContext().setContextProperty("llmRequests", llm_requests)
 
         visibleStart = datetime(2025, 5, 19)
         visibleEnd = datetime(2025, 6, 30)
         
 
-        nodes = graph_nodes_creation(visibleStart, visibleEnd, 'Prism')
-        
-        node_model.update_nodes(nodes)
+        node_model.show_range(visibleStart, visibleEnd, 'Prism')
         
 
         node_model.nodesChanged.connect(lambda: print("Signal onNodesChanged was emitted!"))
@@ -512,6 +1141,9 @@ if __name__ == "__main__":
             print("Failed to load QML file!")
             sys.exit(-1)
 
+        # Write any queued task and activity changes before the app exits
+        app.aboutToQuit.connect(get_writer().flush)
+
         # Execute the application
         sys.exit(app.exec())
 
@@ -0,0 +1,317 @@
+import json
+import os
+import sys
+
+from .Writer import get_writer
+
+"""
+Append-only activity log, partitioned by month.
+
+Recorded step times live under data/activity/ as one JSON Lines file per calendar
+month ("2025-05.jsonl"), plus a small manifest.json describing each partition:
+its row count, first and last timestamp, and rows per project. Logging is a single
+small append plus a manifest update, both performed by the background writer so a
+burst of entries becomes one manifest write and one append per partition. Readers
+flush pending entries, consult the manifest and only open the partitions that
+overlap the requested date range and project.
+
+The older single-file logs (Task_Activity_Log.json as a JSON array, or
+Task_Activity_Log.jsonl) are split into partitions once, the first time the log
+is touched, and kept with a '.migrated' suffix.
+"""
+
+if getattr(sys, 'frozen', False):
+    # Determine base directory when running inside a PyInstaller bundle.
+    BASE_DIR = sys._MEIPASS
+else:
+    # Determine base directory when running normally.
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ACTIVITY_DIR = os.path.join(BASE_DIR, "..", "data", "activity")
+MANIFEST_NAME = "manifest.json"
+
+
+def manifest_path(log_dir):
+    """Return the manifest path of an activity directory."""
+    return os.path.join(log_dir, MANIFEST_NAME)
+
+
+def partition_key(timestamp):
+    """Return the 'YYYY-MM' partition key of a 'YYYY-MM-DD HH:MM:SS' timestamp."""
+    return timestamp[:7]
+
+
+def partition_path(log_dir, key):
+    """Return the JSON Lines file holding a month partition."""
+    return os.path.join(log_dir, f"{key}.jsonl")
+
+
+def load_manifest(log_dir=ACTIVITY_DIR):
+    """
+    Load the partition manifest, converting any legacy single-file log first.
+
+    Parameters:
+    log_dir (str): The activity directory.
+
+    Returns:
+    dict: Mapping of partition key to its summary, empty if there is no activity yet.
+    """
+    get_writer().flush(log_dir)
+    return _read_manifest(log_dir)
+
+
+def activity_signature(log_dir=ACTIVITY_DIR):
+    """
+    Return a cheap value that changes whenever activity is recorded in a directory.
+
+    Queued entries are flushed first; every append rewrites the manifest, so its
+    modification time and size identify the current content.
+
+    Parameters:
+    log_dir (str): The activity directory.
+
+    Returns:
+    tuple or None: (mtime_ns, size) of the manifest, None if there is no activity yet.
+    """
+    get_writer().flush(log_dir)
+    convert_legacy_log(log_dir)
+    try:
+        stat = os.stat(manifest_path(log_dir))
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_manifest(log_dir):
+    """Read the partition manifest without flushing queued entries."""
+    convert_legacy_log(log_dir)
+    try:
+        with open(manifest_path(log_dir), "r", encoding="utf-8") as f:
+            return json.load(f).get("partitions", {})
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError:
+        print(f"Error: Could not decode activity manifest; rebuilding it from {log_dir}")
+        return rebuild_manifest(log_dir)
+
+
+def _save_manifest(log_dir, partitions):
+    """Atomically write the partition manifest."""
+    tmp_file = manifest_path(log_dir) + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump({"partitions": partitions}, f, indent=4)
+    os.replace(tmp_file, manifest_path(log_dir))
+
+
+def _summarize(summary, entry):
+    """Fold one entry into a partition summary."""
+    timestamp = entry.get("timestamp", "")
+    project = entry.get("project")
+    summary["rows"] = summary.get("rows", 0) + 1
+    summary["first"] = min(summary.get("first", timestamp), timestamp)
+    summary["last"] = max(summary.get("last", timestamp), timestamp)
+    projects = summary.setdefault("projects", {})
+    projects[project] = projects.get(project, 0) + 1
+    return summary
+
+
+def rebuild_manifest(log_dir=ACTIVITY_DIR):
+    """
+    Rebuild the manifest by scanning every partition file.
+
+    Parameters:
+    log_dir (str): The activity directory.
+
+    Returns:
+    dict: The rebuilt partition mapping.
+    """
+    partitions = {}
+    for name in sorted(os.listdir(log_dir)) if os.path.isdir(log_dir) else []:
+        if not name.endswith(".jsonl"):
+            continue
+        key = name[:-len(".jsonl")]
+        summary = {}
+        for entry in _read_partition(partition_path(log_dir, key)):
+            _summarize(summary, entry)
+        if summary:
+            partitions[key] = summary
+    _save_manifest(log_dir, partitions)
+    return partitions
+
+
+def convert_legacy_log(log_dir=ACTIVITY_DIR):
+    """
+    Split a legacy single-file activity log into month partitions, once.
+
+    Does nothing if the manifest already exists or there is no legacy log.
+
+    Parameters:
+    log_dir (str): The activity directory, a sibling of the legacy log files.
+    """
+    if os.path.exists(manifest_path(log_dir)):
+        return
+
+    base = os.path.join(os.path.dirname(os.path.normpath(log_dir)), "Task_Activity_Log")
+    entries = None
+    for old_file in (base + ".jsonl", base + ".json"):
+        if not os.path.exists(old_file):
+            continue
+        with open(old_file, "r", encoding="utf-8") as f:
+            try:
+                if old_file.endswith(".jsonl"):
+                    entries = [json.loads(line) for line in f if line.strip()]
+                else:
+                    entries = json.load(f)
+            except json.JSONDecodeError:
+                print(f"Error: Could not decode legacy activity log at {old_file}")
+                return
+        break
+
+    if entries is None:
+        return
+
+    # Group entries by month and write each partition in one go
+    os.makedirs(log_dir, exist_ok=True)
+    grouped = {}
+    for entry in entries:
+        grouped.setdefault(partition_key(entry.get("timestamp", "")), []).append(entry)
+
+    partitions = {}
+    for key, rows in grouped.items():
+        with open(partition_path(log_dir, key), "w", encoding="utf-8") as f:
+            for entry in rows:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                _summarize(partitions.setdefault(key, {}), entry)
+    _save_manifest(log_dir, partitions)
+    os.replace(old_file, old_file + ".migrated")
+
+    print(f"✅ Split {len(entries)} activity entries into {len(partitions)} monthly partitions in {log_dir}")
+
+
+class _PendingActivityWrite:
+    """Activity entries queued for one activity directory."""
+
+    def __init__(self, log_dir):
+        self.log_dir = log_dir
+        self.entries = []
+
+    def write(self):
+        partitions = _read_manifest(self.log_dir)
+        os.makedirs(self.log_dir, exist_ok=True)
+
+        lines_by_key = {}
+        for key, line, summary_fields in self.entries:
+            lines_by_key.setdefault(key, []).append(line)
+            _summarize(partitions.setdefault(key, {}), summary_fields)
+        # Manifest first: a crash before the appends leaves a partition listed
+        # with fewer rows than counted, never rows the manifest doesn't know about
+        _save_manifest(self.log_dir, partitions)
+        for key, lines in lines_by_key.items():
+            path = partition_path(self.log_dir, key)
+            _truncate_torn_tail(path)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+
+
+def _truncate_torn_tail(path):
+    """Cut an incomplete last line off a partition, so the next append starts on a fresh line."""
+    try:
+        with open(path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if not size:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            end = f.read().rfind(b"\n") + 1
+            f.truncate(end)
+    except FileNotFoundError:
+        return
+    print(f"Dropped an incomplete activity entry from {path}")
+
+
+def append_activity(entry, log_dir=ACTIVITY_DIR):
+    """
+    Queue one activity entry for its month partition and the manifest.
+
+    Parameters:
+    entry (dict): Activity record with 'project', 'title', 'description', 'timestamp' and 'duration'.
+    log_dir (str): The activity directory.
+    """
+    queued = (
+        partition_key(entry["timestamp"]),
+        json.dumps(entry, ensure_ascii=False) + "\n",
+        {"timestamp": entry["timestamp"], "project": entry.get("project")},
+    )
+    get_writer().submit(
+        log_dir,
+        lambda: _PendingActivityWrite(log_dir),
+        lambda pending: pending.entries.append(queued),
+    )
+
+
+def partitions_in_range(partitions, start_date=None, end_date=None, project=None):
+    """
+    Return the partition keys that may hold entries for a date range and project.
+
+    Parameters:
+    partitions (dict): Partition mapping from load_manifest.
+    start_date (datetime or None): Inclusive range start; unbounded if None.
+    end_date (datetime or None): Inclusive range end; unbounded if None.
+    project (str or None): Only keep partitions with rows for this project.
+
+    Returns:
+    list: Sorted partition keys.
+    """
+    low = start_date.strftime("%Y-%m") if start_date is not None else None
+    high = end_date.strftime("%Y-%m") if end_date is not None else None
+
+    keys = []
+    for key, summary in sorted(partitions.items()):
+        if low is not None and key < low:
+            continue
+        if high is not None and key > high:
+            continue
+        if project is not None and project not in summary.get("projects", {}):
+            continue
+        keys.append(key)
+    return keys
+
+
+def _read_partition(path):
+    """Stream the entries of one partition file, skipping torn lines."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping unreadable activity entry in {path}")
+
+
+def iter_activity(log_dir=ACTIVITY_DIR, start_date=None, end_date=None, project=None):
+    """
+    Stream activity entries from the partitions overlapping a date range.
+
+    Entries are only pruned at partition granularity; callers still filter by
+    exact timestamp.
+
+    Parameters:
+    log_dir (str): The activity directory.
+    start_date (datetime or None): Inclusive range start; unbounded if None.
+    end_date (datetime or None): Inclusive range end; unbounded if None.
+    project (str or None): Only yield entries for this project.
+
+    Yields:
+    dict: One activity entry at a time.
+    """
+    partitions = load_manifest(log_dir)
+    for key in partitions_in_range(partitions, start_date, end_date, project):
+        path = partition_path(log_dir, key)
+        if not os.path.exists(path):
+            continue
+        for entry in _read_partition(path):
+            if project is None or entry.get("project") == project:
+                yield entry
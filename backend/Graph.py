@@ -1,27 +1,26 @@
 from PySide6.QtCore import QObject, Signal, Property, QAbstractListModel, Qt, QModelIndex
 from PySide6.QtGui import QGuiApplication
 from PySide6.QtQml import QQmlApplicationEngine
-import json
+import threading
+import weakref
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from .Storage import get_backend
 
+_DAY_NS = 86_400 * 1_000_000_000
+_EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday
 
-def load_logs_for_dataframe(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+_activity_cache = None
+_activity_listeners = []
 
-    # Extract only the desired fields
-    records = []
-    for item in data:
-        record = {
-            'project': item.get('project'),
-            'timestamp': item.get('timestamp'),
-            'duration': item.get('duration')
-        }
-        records.append(record)
+
+def load_logs_for_dataframe(start_date=None, end_date=None, project=None, backend=None):
+    # Stream only the desired fields for the range from the storage backend
+    records = (backend or get_backend()).activity_records(start_date, end_date, project)
 
     # Create and return the DataFrame
-    return pd.DataFrame(records)
+    return pd.DataFrame.from_records(records, columns=['project', 'timestamp', 'duration'])
 
 def get_bucket_size(days):
     if days <= 7: return 1
@@ -44,171 +43,573 @@ def parse_duration(s):
         return timedelta(0)
 
 
-def aggregate_nodes(df, start_date, end_date, graph_width=785):
-    # Convert timestamps and durations
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df['duration'] = df['duration'].astype(str).apply(parse_duration)
+def parse_durations(durations):
+    """
+    Convert a duration column to int64 nanoseconds without per-row Python calls.
 
-    # Filter data within the visible range
-    end_datetime = end_date + pd.Timedelta(days=1)
-    mask = (df['timestamp'] >= start_date) & (df['timestamp'] <= end_datetime)
-    df = df[mask].copy()
+    Numeric values are seconds, as reported by backends that pre-aggregate.
+    Strings ("MM:SS" or "H:MM:SS") repeat a lot, so each distinct value is
+    parsed once with parse_duration; anything unparsable counts as zero.
 
-    total_days = (end_date - start_date).days
-    
-    bucket_size = get_bucket_size(total_days)
+    Parameters:
+    durations (pd.Series): The 'duration' column.
+
+    Returns:
+    np.ndarray: Durations in nanoseconds.
+    """
+    if pd.api.types.is_integer_dtype(durations):
+        return durations.to_numpy(np.int64) * 1_000_000_000
+    if pd.api.types.is_numeric_dtype(durations):
+        # Backends that pre-aggregate report durations in seconds
+        values = pd.to_timedelta(durations, unit='s').to_numpy('timedelta64[ns]').view('int64')
+        return np.where(values == np.iinfo(np.int64).min, 0, values)
+
+    codes, uniques = pd.factorize(durations.astype(str))
+    unique_ns = np.array(
+        [parse_duration(value) // timedelta(microseconds=1) * 1000 for value in uniques] + [0],
+        dtype=np.int64,
+    )
+    # Code -1 (missing) picks the trailing zero
+    return unique_ns[codes]
+
+
+def _timestamps_ns(timestamps):
+    """Return a timestamp column as int64 nanoseconds since the epoch (NaT as the int64 minimum)."""
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = pd.to_datetime(timestamps)
+    return timestamps.to_numpy('datetime64[ns]').view('int64')
+
+
+def _bucket_grid(start_date, end_date, bucket_size):
+    """
+    Return the first bucket start and the number of buckets shown for a range.
 
-    # Assign bucket based on size
+    Weekly buckets start on the Monday of start_date's week; other sizes start
+    at start_date itself. Buckets continue while they start on or before end_date.
+    """
     if bucket_size == 7:
-        df['bucket'] = df['timestamp'].dt.to_period('W').apply(lambda p: p.start_time)
+        first = start_date - timedelta(days=start_date.weekday())
     else:
-        df['bucket'] = df['timestamp'].dt.floor(f'{bucket_size}D')
+        first = start_date
+    if first > end_date:
+        return first, 0
+    return first, (end_date - first) // timedelta(days=bucket_size) + 1
+
+
+def _bucket_key(ns, bucket_size):
+    """Return the bucket an instant (int64 ns) is aggregated into."""
+    if bucket_size == 7:
+        # Monday 00:00 of the week
+        days = ns // _DAY_NS
+        return (days - (days + _EPOCH_WEEKDAY) % 7) * _DAY_NS
+    # Aligned to the epoch, like Series.dt.floor(f'{bucket_size}D')
+    step_ns = bucket_size * _DAY_NS
+    return ns - ns % step_ns
+
+
+def bucket_sums(timestamps, durations, start_date, end_date, bucket_size):
+    """
+    Sum durations into the buckets displayed for a date range.
+
+    Rows are kept from start_date through the day after end_date (inclusive) and
+    grouped by _bucket_key. Only groups whose key is one of the displayed bucket
+    starts are shown, so when the first displayed bucket is not itself a bucket
+    key (e.g. a 3-day grid from a start date that is not epoch-aligned), every
+    bucket is zero. Otherwise bucket k holds exactly the rows in
+    [start_k, start_k + bucket_size days).
+
+    Parameters:
+    timestamps (np.ndarray): int64 nanoseconds.
+    durations (np.ndarray): int64 nanoseconds, one per timestamp.
+    start_date (datetime): First visible day.
+    end_date (datetime): Last visible day.
+    bucket_size (int): Bucket size in days, from get_bucket_size.
+
+    Returns:
+    tuple: (first bucket start, int64 array of summed nanoseconds per bucket).
+    """
+    first, count = _bucket_grid(start_date, end_date, bucket_size)
+    sums = np.zeros(count, dtype=np.int64)
+    step_ns = bucket_size * _DAY_NS
+    first_ns = pd.Timestamp(first).as_unit('ns').value
+    if not count or int(_bucket_key(np.int64(first_ns), bucket_size)) != first_ns:
+        return first, sums
+
+    start_ns = pd.Timestamp(start_date).as_unit('ns').value
+    end_ns = pd.Timestamp(end_date + pd.Timedelta(days=1)).as_unit('ns').value
+
+    lower = max(start_ns, first_ns)
+    upper = min(end_ns, first_ns + count * step_ns - 1)
+    mask = (timestamps >= lower) & (timestamps <= upper)
+    np.add.at(sums, (timestamps[mask] - first_ns) // step_ns, durations[mask])
+    return first, sums
+
+
+class GraphNode:
+    """
+    One bucket of the activity graph.
+
+    Attributes:
+    x (int): Horizontal position in pixels.
+    y (int): Vertical position in pixels, 0 at the top.
+    label (str): Bucket start as shown under the node, e.g. 'May 19'.
+    duration_min (float): Minutes worked in the bucket.
+    timestamp (datetime): Start of the bucket.
+    bucket_size (int): Bucket size in days.
+    """
+
+    __slots__ = ('x', 'y', 'label', 'duration_min', 'timestamp', 'bucket_size')
+
+    def __init__(self, x, y, label, duration_min, timestamp, bucket_size):
+        self.x = x
+        self.y = y
+        self.label = label
+        self.duration_min = duration_min
+        self.timestamp = timestamp
+        self.bucket_size = bucket_size
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'GraphNode({fields})'
+
+
+def _total_seconds(ns):
+    """
+    Timedelta.total_seconds() for an int64 nanosecond array.
+
+    Matches the scalar exactly: whole microseconds (floored), then
+    days * 86400 + seconds + microseconds / 1e6.
+    """
+    us = ns // 1000
+    days = us // 86_400_000_000
+    remainder = us - days * 86_400_000_000
+    seconds = remainder // 1_000_000
+    return (days * 86400 + seconds) + (remainder - seconds * 1_000_000) / 1e6
+
+
+def aggregate_nodes(df, start_date, end_date, graph_width=785):
+    # Timestamps and durations as int64 nanoseconds
+    timestamps = _timestamps_ns(df['timestamp'])
+    durations = parse_durations(df['duration'])
+    return aggregate_arrays(timestamps, durations, start_date, end_date, graph_width)
+
+
+def aggregate_arrays(timestamps, durations, start_date, end_date, graph_width=785):
+    """
+    Build graph nodes from activity held in int64 nanosecond arrays.
+
+    Same output as aggregate_nodes; see bucket_sums for the parameters.
+    """
+    bucket_size = get_bucket_size((end_date - start_date).days)
+
+    # Aggregate durations; buckets without activity stay at zero
+    first, bucket_ns = bucket_sums(timestamps, durations, start_date, end_date, bucket_size)
+    return nodes_from_buckets(first, bucket_ns, bucket_size, start_date, end_date, graph_width)
 
-    # Aggregate durations
-    agg = df.groupby('bucket')['duration'].sum().reset_index()
 
-    # Patch in missing buckets (0 durations)
-    patched = add_missing_buckets(agg, start_date, end_date, bucket_size)
+def nodes_from_buckets(first, bucket_ns, bucket_size, start_date, end_date, graph_width=785):
+    """
+    Lay out graph nodes for per-bucket totals.
+
+    Parameters:
+    first (datetime): Start of the first bucket.
+    bucket_ns (np.ndarray): int64 nanoseconds worked per bucket.
+    bucket_size (int): Bucket size in days.
+    start_date (datetime): First visible day.
+    end_date (datetime): Last visible day.
+    graph_width (int): Width of the graph in pixels.
+
+    Returns:
+    list: One node dict per bucket.
+    """
+    count = len(bucket_ns)
 
-    # Calculate max duration (in minutes) for scaling
-    all_durations = [d['duration'].total_seconds() / 60 for d in patched]
     time_span = (end_date - start_date).total_seconds()
 
-    max_duration_min = max(item['duration'].total_seconds() / 60 for item in patched) if patched else 0
+    duration_min = _total_seconds(bucket_ns) / 60
+    max_duration_min = duration_min.max() if count else 0
     padding = 10  # extra space above the tallest bar/node
     unit_height = 1
 
-    nodes = []
-    points = []  # Store points for recalculation
+    # X position remains percentage based
+    first_offset_us = (pd.Timestamp(first).as_unit('ns').value - pd.Timestamp(start_date).as_unit('ns').value) // 1000
+    bucket_offsets_us = first_offset_us + np.arange(count, dtype=np.int64) * (bucket_size * 86_400_000_000)
+    # A single-day range (start == end) has no width to spread over; pin nodes to x=0
+    if count and time_span:
+        x_percent = bucket_offsets_us / 1e6 / time_span
+    else:
+        x_percent = np.zeros(count)
+    x = np.trunc(x_percent * graph_width).astype(np.int64)
 
-    for item in patched:
-        ts = item['bucket']
-        duration_min = item['duration'].total_seconds() / 60
-        label = ts.strftime('%b %d')
+    # Absolute Y position (invert so 0 is bottom)
+    y = np.where(
+        duration_min == 0,
+        310,
+        np.trunc((max_duration_min + padding - duration_min) * unit_height),
+    ).astype(np.int64)
 
-        # X position remains percentage based
-        x_percent = (ts - start_date).total_seconds() / time_span
-        x = int(x_percent * graph_width)
+    bucket_starts = [first + timedelta(days=bucket_size) * i for i in range(count)]
 
-        if duration_min == 0:
-            y = 310
-        else:
-            # Absolute Y position (invert so 0 is bottom)
-            y = int((max_duration_min + padding - duration_min) * unit_height)
-
-        node_data = {
-            'x': x, 
-            'y': y, 
-            'label': label,
-            'duration_min': duration_min,
-            'timestamp': ts,
-            'bucket_size': bucket_size
-        }
-        nodes.append(node_data)
-        
-        # Store points for potential recalculation
-        points.append({
-            'timestamp': ts,
-            'duration_min': duration_min,
-            'x_percent': x_percent
-        })
-
-    # Add points to nodes for recalculation capability
-    for node in nodes:
-        node['points'] = points
-
-    return nodes
+    # Each node keeps its bucket's start and duration
+    return [
+        GraphNode(node_x, node_y, ts.strftime('%b %d'), minutes, ts, bucket_size)
+        for ts, node_x, node_y, minutes in zip(bucket_starts, x.tolist(), y.tolist(), duration_min.tolist())
+    ]
 
 
 def filter_by_project(df, project_name):
     """Returns a new DataFrame containing only rows for the given project."""
     return df[df['project'] == project_name].copy()
 
-def add_missing_buckets(agg, start_date, end_date, bucket_size=7):
+
+class DailyRollup:
     """
-    Returns a list of dicts, one per bucket period, with 0 duration if missing from agg.
-    Handles different bucket sizes dynamically.
+    Seconds worked per day with running totals, for one project.
+
+    Any range of whole days is summed by differencing two running totals, so a
+    graph of any date range and bucket size costs O(buckets) however much
+    history there is. New activity is added in place: on the latest day (the
+    usual case when time is logged) that is O(1), with the arrays growing
+    geometrically as days go by.
+
+    Attributes:
+    origin (int): Day number (days since 1970-01-01) of the first day held.
+    days (int): Number of days held, from origin on.
+    daily (np.ndarray): int64 seconds worked on each day from origin on.
+    prefix (np.ndarray): Running totals of daily with a leading 0, so
+        prefix[i] is the seconds worked before day origin + i.
     """
-    all_buckets = []
-    
-    if bucket_size == 7:
-        # Weekly buckets starting on Monday
-        current = start_date - timedelta(days=start_date.weekday())
-        while current <= end_date:
-            all_buckets.append(current)
-            current += timedelta(days=7)
-    else:
-        # Daily buckets with specified size
-        current = start_date
-        while current <= end_date:
-            all_buckets.append(current)
-            current += timedelta(days=bucket_size)
-
-    # Convert existing buckets to a dict for quick lookup
-    duration_lookup = {row['bucket']: row['duration'] for _, row in agg.iterrows()}
-
-    # Create full list with default durations
-    result = []
-    for b in all_buckets:
-        duration = duration_lookup.get(b, timedelta(0))
-        result.append({'bucket': b, 'duration': duration})
-
-    return result
-
-def recalculate_node_positions(nodes, start_date, end_date, graph_width=785):
-    """
-    Recalculates node positions when bucket size changes due to date range modification.
-    """
-    if not nodes:
-        return nodes
-    
-    # Get the stored points from the first node
-    points = nodes[0].get('points', [])
-    if not points:
-        return nodes
-    
-    total_days = (end_date - start_date).days
-    bucket_size = get_bucket_size(total_days)
-    time_span = (end_date - start_date).total_seconds()
-    
-    # Find max duration for scaling
-    max_duration_min = max(point['duration_min'] for point in points) if points else 0
-    padding = 10
-    unit_height = 1
-    
-    # Recalculate positions for each node
-    for i, node in enumerate(nodes):
-        if i < len(points):
-            point = points[i]
-            
-            # Recalculate X position
-            x_percent = (point['timestamp'] - start_date).total_seconds() / time_span
-            x = int(x_percent * graph_width)
-            
-            # Recalculate Y position
-            duration_min = point['duration_min']
-            if duration_min == 0:
-                y = 310
+
+    def __init__(self, timestamps, seconds):
+        """
+        Parameters:
+        timestamps (np.ndarray): int64 nanoseconds since the epoch, in any order.
+        seconds (np.ndarray): int64 seconds worked, one per timestamp.
+        """
+        days = timestamps // _DAY_NS
+        self.origin = int(days.min()) if len(days) else 0
+        self.days = int(days.max()) - self.origin + 1 if len(days) else 0
+        self._daily = np.zeros(self.days, dtype=np.int64)
+        np.add.at(self._daily, days - self.origin, seconds)
+        self._prefix = np.concatenate(([0], np.cumsum(self._daily)))
+
+    @property
+    def daily(self):
+        return self._daily[:self.days]
+
+    @property
+    def prefix(self):
+        return self._prefix[:self.days + 1]
+
+    def add(self, timestamp, seconds):
+        """
+        Record activity at an instant.
+
+        Parameters:
+        timestamp (int): Nanoseconds since the epoch.
+        seconds (int): Seconds worked.
+        """
+        day = timestamp // _DAY_NS
+        if not self.days:
+            self.origin = day
+        elif day < self.origin:
+            # Back-dated before the first day: shift everything once
+            shift = self.origin - day
+            self._daily = np.concatenate((np.zeros(shift, dtype=np.int64), self.daily))
+            self._prefix = np.concatenate((np.zeros(shift, dtype=np.int64), self.prefix))
+            self.origin = day
+            self.days += shift
+
+        index = day - self.origin
+        if index >= self.days:
+            self._extend(index + 1)
+        self._daily[index] += seconds
+        self._prefix[index + 1:self.days + 1] += seconds
+
+    def _extend(self, days):
+        """Hold `days` days, reallocating with spare room when the arrays are full."""
+        if days > len(self._daily):
+            capacity = max(days, 2 * len(self._daily), 64)
+            daily = np.zeros(capacity, dtype=np.int64)
+            daily[:self.days] = self.daily
+            prefix = np.zeros(capacity + 1, dtype=np.int64)
+            prefix[:self.days + 1] = self.prefix
+            self._daily, self._prefix = daily, prefix
+        # Days without activity carry the last running total forward
+        self._prefix[self.days + 1:days + 1] = self._prefix[self.days]
+        self.days = days
+
+    def range_seconds(self, first_days, end_days):
+        """
+        Sum the seconds worked in the day ranges [first_days, end_days).
+
+        Parameters:
+        first_days (np.ndarray): First day number of each range.
+        end_days (np.ndarray): Day number after the last day of each range.
+
+        Returns:
+        np.ndarray: int64 seconds per range.
+        """
+        low = np.clip(first_days - self.origin, 0, self.days)
+        high = np.clip(end_days - self.origin, 0, self.days)
+        prefix = self.prefix
+        return prefix[np.maximum(high, low)] - prefix[low]
+
+    def bucket_edges(self, start_date, end_date, bucket_size):
+        """
+        Return the buckets displayed for a date range as day numbers.
+
+        Returns:
+        tuple: (first bucket start, int64 array of count + 1 day numbers clipped to
+            start_date through the day after end_date), or (first, None) when every
+            bucket is empty because the first is not aligned (see bucket_sums).
+        """
+        first, count = _bucket_grid(start_date, end_date, bucket_size)
+        first_ns = pd.Timestamp(first).as_unit('ns').value
+        if not count or int(_bucket_key(np.int64(first_ns), bucket_size)) != first_ns:
+            return first, None
+
+        start_day = pd.Timestamp(start_date).as_unit('ns').value // _DAY_NS
+        end_day = pd.Timestamp(end_date).as_unit('ns').value // _DAY_NS + 1
+        return first, np.clip(
+            first_ns // _DAY_NS + np.arange(count + 1, dtype=np.int64) * bucket_size, start_day, end_day
+        )
+
+    def bucket_sums(self, start_date, end_date, bucket_size):
+        """
+        Sum activity into the buckets displayed for a date range.
+
+        Same buckets as the module-level bucket_sums, counting whole days from
+        start_date through end_date.
+
+        Returns:
+        tuple: (first bucket start, int64 array of summed nanoseconds per bucket).
+        """
+        first, edges = self.bucket_edges(start_date, end_date, bucket_size)
+        if edges is None:
+            return first, np.zeros(_bucket_grid(start_date, end_date, bucket_size)[1], dtype=np.int64)
+        return first, self.range_seconds(edges[:-1], edges[1:]) * 1_000_000_000
+
+
+class ProjectActivity:
+    """
+    One project's activity, parsed once and rolled up by day.
+
+    Attributes:
+    rollup (DailyRollup): Seconds worked per day, with running totals.
+    """
+
+    def __init__(self, df):
+        timestamps = _timestamps_ns(df['timestamp'])
+        seconds = parse_durations(df['duration']) // 1_000_000_000
+        # Rows without a timestamp never fall into a bucket
+        keep = timestamps != np.iinfo(np.int64).min
+        self.rollup = DailyRollup(timestamps[keep], seconds[keep])
+
+    def add(self, timestamp, seconds):
+        """
+        Record a newly logged entry.
+
+        Parameters:
+        timestamp (int): Nanoseconds since the epoch.
+        seconds (int): Seconds worked.
+        """
+        self.rollup.add(timestamp, seconds)
+
+    def nodes(self, start_date, end_date, graph_width=785):
+        """
+        Aggregate the cached activity into graph nodes for a date range.
+
+        Activity is counted by whole days, start_date through end_date: backends
+        that pre-aggregate stamp a day's total at its midnight.
+        """
+        bucket_size = get_bucket_size((end_date - start_date).days)
+        first, bucket_ns = self.rollup.bucket_sums(start_date, end_date, bucket_size)
+        return nodes_from_buckets(first, bucket_ns, bucket_size, start_date, end_date, graph_width)
+
+    def update_bucket(self, nodes, start_date, end_date, timestamp):
+        """
+        Refresh, in place, the nodes of a date range after activity was logged at an instant.
+
+        Only the bucket holding the instant is re-summed. Its y changes, and every
+        node's y changes when the tallest bucket does, exactly as if the nodes were
+        built again with nodes().
+
+        Parameters:
+        nodes (list): Nodes from nodes() for the same range.
+        start_date (datetime): First visible day.
+        end_date (datetime): Last visible day.
+        timestamp (int): Nanoseconds since the epoch of the new activity.
+
+        Returns:
+        list: Indexes of the nodes whose y changed; all of them if the scale changed.
+        """
+        bucket_size = get_bucket_size((end_date - start_date).days)
+        first, edges = self.rollup.bucket_edges(start_date, end_date, bucket_size)
+        day = timestamp // _DAY_NS
+        if edges is None or not edges[0] <= day < edges[-1]:
+            return []
+
+        index = int(np.searchsorted(edges, day, side='right')) - 1
+        seconds = self.rollup.range_seconds(edges[index:index + 1], edges[index + 1:index + 2])
+        minutes = float(_total_seconds(seconds * 1_000_000_000)[0] / 60)
+
+        old_max = max(node.duration_min for node in nodes)
+        nodes[index].duration_min = minutes
+        max_duration_min = max(node.duration_min for node in nodes)
+
+        changed = range(len(nodes)) if max_duration_min != old_max else [index]
+        for i in changed:
+            node = nodes[i]
+            node.y = 310 if node.duration_min == 0 else int(max_duration_min + 10 - node.duration_min)
+        return list(changed)
+
+
+class ActivityCache:
+    """
+    Parsed activity of every project, shared by all graph queries in the process.
+
+    A project's activity is read and parsed the first time it is graphed, so moving
+    the date range slider only re-aggregates. Activity logged by this process is
+    added to the cached project with record(). Everything is dropped when the
+    storage backend's activity signature changes for any other reason (activity
+    recorded by another process, or another backend installed), and a project is
+    dropped when invalidate() is called for it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._projects = {}
+        self._backend = None
+        self._signature = None
+        # Set when record() accounted for a change the signature does not show yet
+        self._recorded = False
+
+    def get(self, project):
+        """
+        Return a project's parsed activity, reading it from storage if needed.
+
+        Parameters:
+        project (str): Project name, e.g. 'Prism'.
+
+        Returns:
+        ProjectActivity: The cached activity.
+        """
+        backend = get_backend()
+        signature = backend.activity_signature()
+        with self._lock:
+            if backend is not self._backend:
+                self._projects = {}
+                self._backend = backend
+            elif signature != self._signature and not self._recorded:
+                self._projects = {}
+            self._signature = signature
+            self._recorded = False
+            activity = self._projects.get(project)
+        if activity is None:
+            activity = ProjectActivity(load_logs_for_dataframe(project=project, backend=backend))
+            with self._lock:
+                if self._backend is backend and self._signature == signature:
+                    self._projects[project] = activity
+        return activity
+
+    def peek(self, project):
+        """
+        Return a project's cached activity without checking storage, or None if it is not cached.
+
+        Unlike get(), this never flushes queued writes, so it is cheap enough to call
+        every time activity is logged.
+
+        Parameters:
+        project (str): Project name, e.g. 'Prism'.
+        """
+        with self._lock:
+            if self._backend is not get_backend():
+                return None
+            return self._projects.get(project)
+
+    def record(self, entry):
+        """
+        Add an entry just handed to the storage backend to its project's cached activity.
+
+        Parameters:
+        entry (dict): Activity record with 'project', 'timestamp' and 'duration'.
+
+        Returns:
+        int: The entry's timestamp as nanoseconds since the epoch.
+        """
+        timestamp = pd.Timestamp(entry['timestamp']).as_unit('ns').value
+        seconds = int(parse_duration(str(entry.get('duration'))).total_seconds())
+        with self._lock:
+            self._recorded = True
+            activity = self._projects.get(entry.get('project'))
+            if activity is not None:
+                activity.add(timestamp, seconds)
+        return timestamp
+
+    def invalidate(self, project=None):
+        """Drop one project's parsed activity, or every project's if project is None."""
+        with self._lock:
+            if project is None:
+                self._projects = {}
             else:
-                y = int((max_duration_min + padding - duration_min) * unit_height)
-            
-            # Update node
-            node['x'] = x
-            node['y'] = y
-            node['bucket_size'] = bucket_size
-    
-    return nodes
+                self._projects.pop(project, None)
+
+
+def get_activity_cache():
+    """
+    Return the process-wide activity cache, creating it on first use.
+
+    Returns:
+    ActivityCache: The shared cache.
+    """
+    global _activity_cache
+    if _activity_cache is None:
+        _activity_cache = ActivityCache()
+    return _activity_cache
+
+
+def add_activity_listener(callback):
+    """
+    Call `callback(project, timestamp)` whenever activity is logged.
+
+    Bound methods are held weakly, so registering does not keep their object alive.
+
+    Parameters:
+    callback (callable): Receives the project name and the entry's timestamp
+        as nanoseconds since the epoch, on the thread that logged it.
+    """
+    if hasattr(callback, '__self__') and hasattr(callback, '__func__'):
+        _activity_listeners.append(weakref.WeakMethod(callback))
+    else:
+        _activity_listeners.append(lambda: callback)
+
+
+def notify_activity(entry):
+    """
+    Publish an activity entry that was just recorded.
+
+    The entry is added to the cached rollup of its project and passed on to the
+    activity listeners, so graphs on screen can update the affected bucket.
+
+    Parameters:
+    entry (dict): The logged entry, with 'project', 'timestamp' and 'duration'.
+    """
+    timestamp = get_activity_cache().record(entry)
+    for reference in list(_activity_listeners):
+        callback = reference()
+        if callback is None:
+            _activity_listeners.remove(reference)
+        else:
+            callback(entry.get('project'), timestamp)
+
 
 def graph_nodes_creation(start_date, end_date, project):
-    file = 'C:/Users/adhir/Development/PRISM/data/Task_Activity_Log.json'
-    df = load_logs_for_dataframe(file)
-    fdf = filter_by_project(df, project)
-    nodes = aggregate_nodes(fdf, start_date, end_date)
-    return nodes
+    # Parsed and rolled up once per project; each date range only differences running totals
+    return get_activity_cache().get(project).nodes(start_date, end_date)
 
 if __name__ == '__main__':
-    file = 'C:/Users/adhir/Developement/Personal_Dev/Tablet/PRISM/data/Task_Activity_Log.json'
-    df = load_logs_for_dataframe(file)
+    df = load_logs_for_dataframe()
     fdf = filter_by_project(df, 'Prism')
 
     visibleStart = datetime(2025, 5, 19)
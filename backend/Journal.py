@@ -0,0 +1,286 @@
+import json
+import os
+import shutil
+import zlib
+
+from .Writer import get_writer
+
+"""
+Append-only operation journal for the *_Task_Data.json project files.
+
+Each project file keeps its JSON snapshot untouched while mutations are appended
+as one JSON line per operation to a sibling "<file>.journal". Loading replays the
+journal on top of the snapshot. Once the journal grows past COMPACT_THRESHOLD
+operations, the replayed list is written back as a fresh snapshot and the journal
+is dropped.
+
+Operations and snapshots are serialized on the calling thread, so later in-place
+edits cannot leak into them, and handed to the background writer, which coalesces
+them per file. Snapshots are written to a temporary file, synced and renamed into
+place, so an interrupted write never leaves a truncated project file behind.
+
+The first line of every journal is a header holding a fingerprint of the snapshot
+it was started against. A journal whose fingerprint no longer matches its snapshot
+has already been folded in (or the snapshot was replaced) and is ignored.
+
+The modification time and size of the snapshot and journal are remembered after
+every load and write, so is_current() can tell whether someone else changed the
+files without reading them.
+"""
+
+JOURNAL_SUFFIX = ".journal"
+COMPACT_THRESHOLD = 200
+
+# Per-file on-disk bookkeeping: snapshot fingerprint, whether the journal has its
+# header, and the (mtime, size) signature of both files after our last load or write
+_disk_state = {}
+
+# Per-file count of operations submitted since the last snapshot
+_op_counts = {}
+
+
+def journal_path(tasks_file):
+    """Return the journal path belonging to a tasks JSON file."""
+    return tasks_file + JOURNAL_SUFFIX
+
+
+def _fingerprint(raw):
+    """Return a short fingerprint of the raw snapshot bytes."""
+    return f"{len(raw)}:{zlib.crc32(raw):08x}"
+
+
+def _signature(tasks_file):
+    """Return the (mtime, size) of a snapshot and its journal, None for missing files."""
+    signature = []
+    for path in (tasks_file, journal_path(tasks_file)):
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def is_current(tasks_file):
+    """
+    Return True if a project's files are unchanged since we last loaded or wrote them.
+
+    Only the files' modification time and size are checked; nothing is read.
+
+    Parameters:
+    tasks_file (str): Path to the *_Task_Data.json snapshot.
+    """
+    state = _disk_state.get(tasks_file)
+    return state is not None and state.get("signature") == _signature(tasks_file)
+
+
+def apply_op(tasks, op):
+    """
+    Apply a single journal operation to a full task list in place.
+
+    Parameters:
+    tasks (list): The full (uncategorized) task list of a project.
+    op (dict): Operation with an 'op' key and its positional arguments.
+    """
+    kind = op["op"]
+    if kind == "insert":
+        tasks.insert(op["index"], op["task"])
+    elif kind == "remove":
+        del tasks[op["index"]]
+    elif kind == "move":
+        tasks.insert(op["to"], tasks.pop(op["from"]))
+    elif kind == "swap":
+        a, b = op["a"], op["b"]
+        tasks[a], tasks[b] = tasks[b], tasks[a]
+    elif kind == "set":
+        tasks[op["index"]] = op["task"]
+    elif kind == "update":
+        tasks[op["index"]].update(op["fields"])
+    elif kind == "steps":
+        tasks[op["index"]]["steps"] = op["steps"]
+    elif kind == "step":
+        tasks[op["index"]]["steps"][op["step"]].update(op["fields"])
+    elif kind == "insert_step":
+        tasks[op["index"]].setdefault("steps", []).insert(op["at"], op["step"])
+    else:
+        raise ValueError(f"Unknown journal operation '{kind}'")
+
+
+def load_tasks(tasks_file):
+    """
+    Load a project's task list by replaying its journal on top of the snapshot.
+
+    Any writes still queued for the file are flushed first.
+
+    Parameters:
+    tasks_file (str): Path to the *_Task_Data.json snapshot.
+
+    Returns:
+    list: The current task list, or an empty list if the snapshot is missing or invalid.
+    """
+    get_writer().flush(tasks_file)
+
+    raw = b""
+    if os.path.exists(tasks_file):
+        with open(tasks_file, "rb") as f:
+            raw = f.read()
+
+    try:
+        tasks = json.loads(raw) if raw.strip() else []
+    except json.JSONDecodeError:
+        # Keep the damaged file around instead of letting a later write replace it
+        shutil.copyfile(tasks_file, tasks_file + ".corrupt")
+        print(f"Error: Invalid JSON format in {tasks_file}; saved a copy as {tasks_file}.corrupt")
+        tasks = []
+    if not isinstance(tasks, list):
+        tasks = []
+
+    fingerprint = _fingerprint(raw)
+    applied = 0
+
+    path = journal_path(tasks_file)
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            data = f.read()
+        # Only newline-terminated lines are complete writes
+        lines = data.split(b"\n")[:-1]
+
+        header = _decode_line(lines[0]) if lines else None
+        if header and header.get("snapshot") == fingerprint:
+            end = len(lines[0]) + 1
+            for line in lines[1:]:
+                op = _decode_line(line)
+                if op is None:
+                    # A torn trailing write; everything before it is intact
+                    break
+                apply_op(tasks, op)
+                applied += 1
+                end += len(line) + 1
+            if end < len(data):
+                # Cut the torn write off, or the next append would be glued onto it
+                with open(path, "r+b") as f:
+                    f.truncate(end)
+                print(f"Dropped an incomplete journal entry from {path}")
+        else:
+            # Journal belongs to an older snapshot and was already compacted
+            os.remove(path)
+
+    _disk_state[tasks_file] = {
+        "snapshot": fingerprint,
+        "header": os.path.exists(path),
+        "signature": _signature(tasks_file),
+    }
+    _op_counts[tasks_file] = applied
+    return tasks
+
+
+def _decode_line(line):
+    """Decode one journal line, returning None if it is incomplete."""
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+class _PendingJournalWrite:
+    """Writes queued for one project file: at most one snapshot, then journal lines."""
+
+    def __init__(self, tasks_file):
+        self.tasks_file = tasks_file
+        self.snapshot = None
+        self.lines = []
+
+    def add_lines(self, lines):
+        self.lines.extend(lines)
+
+    def set_snapshot(self, raw):
+        # A newer snapshot already contains every queued operation
+        self.snapshot = raw
+        self.lines = []
+
+    def write(self):
+        if self.snapshot is not None:
+            _write_snapshot(self.tasks_file, self.snapshot)
+        if self.lines:
+            _write_journal_lines(self.tasks_file, self.lines)
+        _disk_state[self.tasks_file]["signature"] = _signature(self.tasks_file)
+
+
+def append_ops(tasks_file, ops, tasks):
+    """
+    Queue operations for a project's journal, compacting it once it grows too long.
+
+    Parameters:
+    tasks_file (str): Path to the *_Task_Data.json snapshot.
+    ops (list): Operations already applied to `tasks`.
+    tasks (list): The full task list after applying `ops`, used for compaction.
+    """
+    if not ops:
+        return
+
+    count = _op_counts.get(tasks_file, 0) + len(ops)
+    if tasks_file not in _op_counts or count >= COMPACT_THRESHOLD:
+        compact(tasks_file, tasks)
+        return
+
+    _op_counts[tasks_file] = count
+    lines = [json.dumps(op, ensure_ascii=False) for op in ops]
+    get_writer().submit(
+        tasks_file,
+        lambda: _PendingJournalWrite(tasks_file),
+        lambda pending: pending.add_lines(lines),
+    )
+
+
+def compact(tasks_file, tasks):
+    """
+    Queue the full task list as a new snapshot that replaces the journal.
+
+    Parameters:
+    tasks_file (str): Path to the *_Task_Data.json snapshot.
+    tasks (list): The full task list to persist.
+    """
+    raw = json.dumps(tasks, indent=4, ensure_ascii=False).encode("utf-8")
+    _op_counts[tasks_file] = 0
+    get_writer().submit(
+        tasks_file,
+        lambda: _PendingJournalWrite(tasks_file),
+        lambda pending: pending.set_snapshot(raw),
+    )
+
+
+def _write_snapshot(tasks_file, raw):
+    """
+    Atomically replace a snapshot and drop its journal.
+
+    The snapshot is written to a temporary file, synced and renamed into place, so
+    the old snapshot plus journal stays valid until the new snapshot is complete.
+    """
+    tmp_path = tasks_file + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, tasks_file)
+
+    path = journal_path(tasks_file)
+    if os.path.exists(path):
+        os.remove(path)
+
+    _disk_state[tasks_file] = {"snapshot": _fingerprint(raw), "header": False}
+
+
+def _write_journal_lines(tasks_file, lines):
+    """Append serialized operations, starting the journal with its header if needed."""
+    state = _disk_state[tasks_file]
+    path = journal_path(tasks_file)
+
+    if state["header"] and os.path.exists(path):
+        mode = "a"
+    else:
+        lines = [json.dumps({"snapshot": state["snapshot"]})] + lines
+        mode = "w"
+
+    with open(path, mode, encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    state["header"] = True
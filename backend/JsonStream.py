@@ -0,0 +1,172 @@
+import json
+
+"""
+Incremental parser for a JSON object that arrives in pieces.
+
+LLM responses are streamed a few characters at a time. JsonEventParser is fed
+those chunks and reports parts of the top-level object as soon as they are
+complete, without waiting for the closing brace:
+
+- ("field", key, value) for each top-level member;
+- ("item", value) for each element of one chosen array member (e.g. "Steps"),
+  instead of a single field for the whole array.
+
+Anything before the first '{' (such as a ```json fence) and after the object's
+closing brace is ignored.
+"""
+
+
+class JsonEventParser:
+    """
+    Streaming scanner for one top-level JSON object.
+
+    Attributes:
+    array_key (str): Top-level member whose elements are reported one by one (case-insensitive).
+    """
+
+    def __init__(self, array_key="Steps"):
+        self.array_key = array_key.lower()
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._finished = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._expect_key = True
+        self._key = None
+        self._value_start = None   # start of the current top-level value
+        self._array_depth = None   # nesting depth of the streamed array's elements
+        self._item_start = None    # start of the current array element
+
+    def feed(self, chunk):
+        """
+        Scan the next chunk of text.
+
+        Parameters:
+        chunk (str): The next piece of the response.
+
+        Returns:
+        list: Events completed by this chunk, in order.
+        """
+        self._buffer += chunk
+        events = []
+        buffer = self._buffer
+        i = self._pos
+        while i < len(buffer) and not self._finished:
+            ch = buffer[i]
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._close_string(i, events)
+                i += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+                self._open_value(i)
+            elif ch in "{[":
+                self._open_value(i)
+                if ch == "[" and self._depth == 1 and self._is_array_key():
+                    self._array_depth = self._depth + 1
+                self._depth += 1
+            elif ch in "}]":
+                self._close_container(i, events)
+            elif ch == ":" and self._depth == 1:
+                self._expect_key = False
+            elif ch == ",":
+                self._end_scalar(i, events)
+                if self._depth == 1:
+                    self._expect_key = True
+            elif not ch.isspace():
+                self._open_value(i)
+            i += 1
+
+        self._pos = i
+        return events
+
+    def _is_array_key(self):
+        return self._key is not None and self._key.lower() == self.array_key
+
+    def _in_array(self):
+        return self._array_depth is not None and self._depth == self._array_depth
+
+    def _open_value(self, i):
+        """Remember where a top-level value or streamed array element starts."""
+        if self._depth == 1 and not self._expect_key and self._value_start is None:
+            self._value_start = i
+        elif self._in_array() and self._item_start is None:
+            self._item_start = i
+
+    def _close_string(self, i, events):
+        if self._depth == 1:
+            if self._expect_key:
+                self._key = _decode(self._buffer[self._string_start:i + 1])
+            elif self._value_start == self._string_start:
+                self._emit_field(self._buffer[self._value_start:i + 1], events)
+        elif self._in_array() and self._item_start == self._string_start:
+            self._emit_item(self._buffer[self._item_start:i + 1], events)
+
+    def _end_scalar(self, i, events):
+        """Finish a number, boolean or null value ended by ',' or a closing bracket."""
+        if self._depth == 1 and self._value_start is not None:
+            self._emit_field(self._buffer[self._value_start:i].strip(), events)
+        elif self._in_array() and self._item_start is not None:
+            self._emit_item(self._buffer[self._item_start:i].strip(), events)
+
+    def _close_container(self, i, events):
+        self._end_scalar(i, events)
+        self._depth -= 1
+
+        if self._array_depth is not None:
+            if self._depth == self._array_depth and self._item_start is not None:
+                # A nested element of the streamed array is complete
+                self._emit_item(self._buffer[self._item_start:i + 1], events)
+                return
+            if self._depth == self._array_depth - 1:
+                # The streamed array itself is complete; its elements were already reported
+                self._array_depth = None
+                self._value_start = None
+                return
+
+        if self._depth == 1 and self._value_start is not None:
+            self._emit_field(self._buffer[self._value_start:i + 1], events)
+        elif self._depth == 0:
+            self._finished = True
+
+    def _emit_field(self, raw, events):
+        self._value_start = None
+        value = _decode(raw)
+        if value is not _INVALID:
+            events.append(("field", self._key, value))
+
+    def _emit_item(self, raw, events):
+        self._item_start = None
+        value = _decode(raw)
+        if value is not _INVALID:
+            events.append(("item", value))
+
+
+_INVALID = object()
+
+
+def _decode(raw):
+    """Decode one complete JSON value, returning _INVALID if it does not parse."""
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return _INVALID
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+"""
+Content-addressed cache of LLM responses.
+
+Responses are keyed by a SHA-256 of (model, rule, input), so sending the same rule
+and payload again (re-expanding a step after undoing it, retrying an operation)
+returns the stored response instead of making another API call.
+
+There are two tiers:
+- an in-memory LRU of the most recent MEMORY_ENTRIES responses;
+- one small JSON file per response under data/llm_cache/, evicted oldest-used
+  first once the directory grows past DISK_BYTES.
+
+Only successful responses are stored. Callers that find a cached response
+unusable (for example, malformed JSON) discard it so the next attempt goes to the
+API again. Set PRISM_LLM_CACHE=off to disable the cache.
+"""
+
+if getattr(sys, 'frozen', False):
+    # Determine base directory when running inside a PyInstaller bundle.
+    BASE_DIR = sys._MEIPASS
+else:
+    # Determine base directory when running normally.
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CACHE_DIR = os.path.join(BASE_DIR, "..", "data", "llm_cache")
+MEMORY_ENTRIES = 256
+DISK_BYTES = 32 * 1024 * 1024
+
+_cache = None
+
+
+def get_cache():
+    """
+    Return the process-wide response cache, or None if it is disabled.
+
+    Returns:
+    ResponseCache or None: The shared cache.
+    """
+    global _cache
+    if os.environ.get("PRISM_LLM_CACHE", "on").lower() in ("off", "0", "false"):
+        return None
+    if _cache is None:
+        _cache = ResponseCache(CACHE_DIR)
+    return _cache
+
+
+def cache_key(model, rule, user_input):
+    """
+    Return the cache key of a request.
+
+    Parameters:
+    model (str): Model name.
+    rule (str): System prompt.
+    user_input (str): User message, already serialized to a string.
+
+    Returns:
+    str: Hex SHA-256 digest.
+    """
+    raw = json.dumps([model, rule, user_input], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU, then disk) response store with hit/miss counters.
+
+    Attributes:
+    directory (str): Where the disk tier keeps one JSON file per response.
+    memory_entries (int): Capacity of the memory tier.
+    disk_bytes (int): Size the disk tier is trimmed back to.
+    hits (int): Lookups answered from memory.
+    disk_hits (int): Lookups answered from disk.
+    misses (int): Lookups that found nothing.
+    """
+
+    def __init__(self, directory, memory_entries=MEMORY_ENTRIES, disk_bytes=DISK_BYTES):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.disk_bytes = disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._disk_sizes = None  # key -> file size, scanned on first disk access
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """
+        Return the cached response for a key, or None.
+
+        Parameters:
+        key (str): Key from cache_key().
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            response = self._read_disk(key)
+            if response is None:
+                self.misses += 1
+                return None
+
+            self.disk_hits += 1
+            self._remember(key, response)
+            return response
+
+    def put(self, key, response):
+        """
+        Store a response in both tiers.
+
+        Parameters:
+        key (str): Key from cache_key().
+        response (str): The response content.
+        """
+        with self._lock:
+            self._remember(key, response)
+            self._write_disk(key, response)
+
+    def discard(self, key):
+        """
+        Drop a response from both tiers, e.g. because it could not be parsed.
+
+        Parameters:
+        key (str): Key from cache_key().
+        """
+        with self._lock:
+            self._memory.pop(key, None)
+            sizes = self._sizes()
+            if sizes.pop(key, None) is not None:
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self):
+        """
+        Return the hit and miss counters.
+
+        Returns:
+        dict: 'hits', 'disk_hits', 'misses', 'memory_entries' and 'disk_bytes'.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_bytes": sum(self._sizes().values()),
+            }
+
+    # Memory tier
+
+    def _remember(self, key, response):
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    # Disk tier
+
+    def _sizes(self):
+        """Return the disk tier's key -> size map, scanning the directory once."""
+        if self._disk_sizes is None:
+            self._disk_sizes = {}
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    if name.endswith(".json"):
+                        path = os.path.join(self.directory, name)
+                        self._disk_sizes[name[:-len(".json")]] = os.path.getsize(path)
+        return self._disk_sizes
+
+    def _read_disk(self, key):
+        if key not in self._sizes():
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                response = json.load(f)["response"]
+        except (OSError, ValueError, KeyError):
+            self._sizes().pop(key, None)
+            return None
+        # Touch the file so eviction keeps recently used responses
+        os.utime(path)
+        return response
+
+    def _write_disk(self, key, response):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"response": response}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error: Could not write LLM cache entry: {e}")
+            return
+        self._sizes()[key] = os.path.getsize(path)
+        self._evict()
+
+    def _evict(self):
+        """Delete least recently used files until the disk tier fits in disk_bytes."""
+        sizes = self._sizes()
+        total = sum(sizes.values())
+        if total <= self.disk_bytes:
+            return
+
+        def last_used(key):
+            try:
+                return os.path.getmtime(self._path(key))
+            except OSError:
+                return 0
+
+        for key in sorted(sizes, key=last_used):
+            if total <= self.disk_bytes:
+                break
+            total -= sizes.pop(key)
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
@@ -1,6 +1,273 @@
 import openai
 import base64
-import json 
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .LLMCache import get_cache, cache_key
+from .Prompts import compact_json, estimate_tokens
+
+"""
+OpenAI chat completion calls for task generation.
+
+One client is created on first use and shared by every call. The API key file is
+read once, and the client's pooled HTTP connection is kept alive between calls,
+so repeated requests skip the file read, client construction and TLS handshake.
+
+Successful responses are stored in the response cache (see LLMCache.py); an
+identical (model, rule, input) request is answered from it without an API call.
+Identical requests made while one is still in flight (a double click, a repeated
+Enter) do not start their own call: they wait for the first and share its result.
+
+gpt_api_calls() sends several requests concurrently, at most
+MAX_CONCURRENT_REQUESTS at a time. When the API answers with a rate limit error,
+every caller pauses until the advertised (or an exponentially growing) delay has
+passed before retrying, so a burst of requests backs off together.
+
+gpt_api_stream() yields the response text in pieces as the API produces them. A
+failure, even one after part of the response arrived, is yielded as a StreamError
+so it is never mistaken for more content.
+
+Structured inputs are sent as compact JSON, and every API call logs an estimate
+of its prompt size in tokens (see Prompts.py).
+
+Configuration (environment variables, read when the client is created):
+PRISM_API_KEY_FILE: Path of the base64-encoded API key file.
+PRISM_API_KEY: Plain API key; takes precedence over the key file.
+PRISM_OPENAI_BASE_URL: API base URL, e.g. a local OpenAI-compatible server.
+PRISM_JSON_MODE: Set to "off" for servers without JSON mode (response_format).
+"""
+
+API_KEY_FILE = os.environ.get("PRISM_API_KEY_FILE", "C:/Users/adhir/Development/LeJarvis/api_key.txt")
+BASE_URL = os.environ.get("PRISM_OPENAI_BASE_URL") or None
+MODEL = "gpt-4o-mini-2024-07-18"
+
+# Every Prism prompt asks for a JSON object, so have the API guarantee one
+JSON_MODE = os.environ.get("PRISM_JSON_MODE", "on").lower() not in ("off", "0", "false")
+
+# gpt_api_call reports failures as text starting with one of these
+ERROR_PREFIXES = ("Error:", "An unexpected error occurred:")
+# ... and failures to reach the API (offline, timeouts) starting with this one
+CONNECTION_ERROR_PREFIX = "Error: Could not reach the API:"
+# Exceptions that mean the API could not be reached, for callers outside gpt_api_call
+CONNECTION_EXCEPTIONS = (openai.APIConnectionError, ConnectionError, TimeoutError)
+
+MAX_CONCURRENT_REQUESTS = 4
+RATE_LIMIT_RETRIES = 4
+RATE_LIMIT_BACKOFF_SECONDS = 1.0
+
+_client = None
+_client_lock = threading.Lock()
+
+# Monotonic time before which no request should be sent, after a rate limit error
+_backoff_until = 0.0
+_backoff_lock = threading.Lock()
+
+# In-flight requests by cache key, joined by identical concurrent requests
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+class StreamError(str):
+    """An error message yielded by gpt_api_stream in place of (further) response content."""
+
+
+class _Flight:
+    """
+    One request in flight, which identical requests wait on instead of sending their own.
+
+    Attributes:
+    done (threading.Event): Set when the request has finished.
+    result (str or None): Response or error message; None if the request was abandoned.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+def _join_flight(key):
+    """
+    Return the in-flight request for a cache key, registering a new one if there is none.
+
+    Returns:
+    tuple: (flight, leader) where leader is True if the caller must send the request.
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        if flight is not None:
+            return flight, False
+        flight = _flights[key] = _Flight()
+        return flight, True
+
+
+def _land_flight(key, flight, result):
+    """Finish an in-flight request and hand its result to every caller waiting on it."""
+    with _flights_lock:
+        _flights.pop(key, None)
+    flight.result = result
+    flight.done.set()
+
+
+def read_api_key(key_file=None):
+    """
+    Return the decoded API key.
+
+    Parameters:
+    key_file (str or None): Base64-encoded key file; API_KEY_FILE if None.
+
+    Returns:
+    str: The API key.
+    """
+    plain_key = os.environ.get("PRISM_API_KEY")
+    if plain_key:
+        return plain_key.strip()
+
+    with open(key_file or API_KEY_FILE, 'r') as file:
+        encoded_key = file.read().strip()  # Remove any extra whitespace/newlines
+    return base64.b64decode(encoded_key).decode('utf-8').strip()
+
+
+def get_client():
+    """
+    Return the shared OpenAI client, creating it on first use.
+
+    Returns:
+    openai.OpenAI: Client bound to the configured key and base URL.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = openai.OpenAI(api_key=read_api_key(), base_url=BASE_URL)
+        return _client
+
+
+def configure_client(base_url=None, api_key=None):
+    """
+    Replace the shared client, e.g. to point it at a local stand-in server.
+
+    Parameters:
+    base_url (str or None): API base URL; the OpenAI default if None.
+    api_key (str or None): API key; read from the environment or key file if None.
+    """
+    global _client, BASE_URL
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        BASE_URL = base_url
+        _client = openai.OpenAI(api_key=api_key or read_api_key(), base_url=base_url)
+
+
+def _wait_for_backoff():
+    """Sleep until any rate limit pause shared by all callers has passed."""
+    delay = _backoff_until - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _back_off(error, attempt):
+    """
+    Pause all callers after a rate limit error.
+
+    Uses the server's Retry-After header when present, otherwise an exponential
+    delay with jitter.
+    """
+    global _backoff_until
+    delay = None
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            delay = float(response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            delay = None
+    if delay is None:
+        delay = RATE_LIMIT_BACKOFF_SECONDS * (2 ** attempt) * (1 + random.random() / 2)
+
+    with _backoff_lock:
+        _backoff_until = max(_backoff_until, time.monotonic() + delay)
+
+
+def _serialize_input(user_input):
+    """Return the user message sent for an input, converting non-strings to compact JSON."""
+    if not isinstance(user_input, str):
+        # Convert user_input to a JSON string if it's not already a string
+        return compact_json(user_input)
+    # If it's already a string, use it as is
+    return user_input
+
+
+def is_error_response(response):
+    """Return True if a gpt_api_call result is an error message rather than a response."""
+    return not response or response.startswith(ERROR_PREFIXES)
+
+
+def is_connection_error(response):
+    """Return True if a gpt_api_call result reports that the API could not be reached."""
+    return bool(response) and response.startswith(CONNECTION_ERROR_PREFIX)
+
+
+def has_cached_response(user_input, rule):
+    """
+    Return True if a request would be answered from the response cache.
+
+    Parameters:
+    user_input (str | dict): The request's user message or data.
+    rule (str): The request's system prompt.
+    """
+    cache = get_cache()
+    return cache is not None and cache.get(cache_key(MODEL, rule, _serialize_input(user_input))) is not None
+
+
+def replace_cached_response(user_input, rule, content):
+    """
+    Store a corrected response for a request, e.g. after repairing malformed output.
+
+    Parameters:
+    user_input (str | dict): The request's user message or data.
+    rule (str): The request's system prompt.
+    content (str): The response to return for this request from now on.
+    """
+    cache = get_cache()
+    if cache is not None:
+        cache.put(cache_key(MODEL, rule, _serialize_input(user_input)), content)
+
+
+def discard_cached_response(user_input, rule):
+    """
+    Forget the cached response to a request, so the next call asks the API again.
+
+    Parameters:
+    user_input (str | dict): The request's user message or data.
+    rule (str): The request's system prompt.
+    """
+    cache = get_cache()
+    if cache is not None:
+        cache.discard(cache_key(MODEL, rule, _serialize_input(user_input)))
+
+
+def _create_completion(client, rule, user_input_str, **options):
+    """Send one chat completion request, backing off while the API is rate limiting us."""
+    if JSON_MODE:
+        options.setdefault("response_format", {"type": "json_object"})
+    print(f"LLM call: ~{estimate_tokens(rule) + estimate_tokens(user_input_str)} prompt tokens")
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        _wait_for_backoff()
+        try:
+            return client.chat.completions.create(
+                model=MODEL,
+                messages=[
+                    {"role": "system", "content": rule},
+                    {"role": "user", "content": user_input_str}
+                ],
+                **options
+            )
+        except openai.RateLimitError as e:
+            if attempt == RATE_LIMIT_RETRIES:
+                raise
+            _back_off(e, attempt)
+
 
 def gpt_api_call(user_input, rule):
     """
@@ -13,40 +280,148 @@ def gpt_api_call(user_input, rule):
     Returns:
     str: GPT response content or error message.
     """
-    try:
-        # Read the base64-encoded API key from the file
-        with open('C:/Users/adhir/Development/LeJarvis/api_key.txt', 'r') as file:
-            encoded_key = file.read().strip()  # Remove any extra whitespace/newlines
+    user_input_str = _serialize_input(user_input)
 
-        # Decode the base64-encoded key
-        decoded_key = base64.b64decode(encoded_key).decode('utf-8').strip()
-        print(decoded_key)
+    cache = get_cache()
+    key = cache_key(MODEL, rule, user_input_str)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
 
-        # Set the API key
-        client = openai.OpenAI(api_key=decoded_key) 
+    flight, leader = _join_flight(key)
+    if not leader:
+        # An identical request is already in flight; share its result
+        flight.done.wait()
+        if flight.result is not None:
+            return flight.result
+        return gpt_api_call(user_input, rule)
 
-        if not isinstance(user_input, str):
-        # Convert user_input to a JSON string if it's not already a string
-            user_input_str = json.dumps(user_input)
-        else:
-            # If it's already a string, use it as is
-            user_input_str = user_input
+    content = None
+    try:
+        # The request may have finished between the cache lookup and joining
+        cached = cache.get(key) if cache is not None else None
+        content = cached if cached is not None else _fetch(cache, key, rule, user_input_str)
+    finally:
+        _land_flight(key, flight, content)
+    return content
+
+
+def _fetch(cache, key, rule, user_input_str):
+    """Make the API call for gpt_api_call, returning the content or an error message."""
+    try:
+        client = get_client()
 
         # Make the API call
-        response = client.chat.completions.create(
-            model="gpt-4o-mini-2024-07-18",
-            messages=[
-                {"role": "system", "content": rule},
-                {"role": "user", "content": user_input_str}
-            ]
-        )
-    
-        # Extract and return the response content
-        return response.choices[0].message.content
+        response = _create_completion(client, rule, user_input_str)
+
+        # Extract the response content and keep it for identical requests
+        content = response.choices[0].message.content
+        if cache is not None and content:
+            cache.put(key, content)
+        return content
 
+    except openai.APIConnectionError as e:
+        return f"{CONNECTION_ERROR_PREFIX} {str(e)}"
     except FileNotFoundError:
         return "Error: The file 'api_key.txt' was not found. Please ensure it exists."
     except base64.binascii.Error:
         return "Error: The API key in 'api_key.txt' is not correctly base64-encoded."
     except Exception as e:
         return f"An unexpected error occurred: {str(e)}"
+
+
+def gpt_api_stream(user_input, rule):
+    """
+    Call OpenAI's GPT API and yield the response as it is generated.
+
+    A cached response, or that of an identical request already in flight, is
+    yielded in one piece. Errors are yielded as a StreamError holding the message
+    gpt_api_call would return, after whatever content had already arrived.
+
+    Parameters:
+    user_input (str | dict): User message or data (converted to JSON if needed).
+    rule (str): The system-level instruction or behavior rule.
+
+    Yields:
+    str: The next piece of the response content, or a StreamError as the last item.
+    """
+    user_input_str = _serialize_input(user_input)
+
+    cache = get_cache()
+    key = cache_key(MODEL, rule, user_input_str)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    flight, leader = _join_flight(key)
+    if not leader:
+        flight.done.wait()
+        if flight.result is not None:
+            yield StreamError(flight.result) if is_error_response(flight.result) else flight.result
+        else:
+            yield from gpt_api_stream(user_input, rule)
+        return
+
+    # Stays None if the caller stops reading early, so waiting callers send their own request
+    result = None
+    try:
+        client = get_client()
+        stream = _create_completion(client, rule, user_input_str, stream=True)
+
+        parts = []
+        finished = False
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+            finished = finished or chunk.choices[0].finish_reason is not None
+
+        if not finished:
+            # The connection closed before the API said the response was complete
+            result = f"{CONNECTION_ERROR_PREFIX} The response stream ended early."
+            yield StreamError(result)
+            return
+
+        # Keep the full response for identical requests
+        result = "".join(parts)
+        if cache is not None and parts:
+            cache.put(key, result)
+
+    except openai.APIConnectionError as e:
+        result = f"{CONNECTION_ERROR_PREFIX} {str(e)}"
+        yield StreamError(result)
+    except FileNotFoundError:
+        result = "Error: The file 'api_key.txt' was not found. Please ensure it exists."
+        yield StreamError(result)
+    except base64.binascii.Error:
+        result = "Error: The API key in 'api_key.txt' is not correctly base64-encoded."
+        yield StreamError(result)
+    except Exception as e:
+        result = f"An unexpected error occurred: {str(e)}"
+        yield StreamError(result)
+    finally:
+        _land_flight(key, flight, result)
+
+
+def gpt_api_calls(calls, max_concurrent=MAX_CONCURRENT_REQUESTS):
+    """
+    Send several GPT requests concurrently.
+
+    Parameters:
+    calls (list): (user_input, rule) pairs, as passed to gpt_api_call.
+    max_concurrent (int): Most requests in flight at once.
+
+    Returns:
+    list: Responses (or error messages) in the same order as calls.
+    """
+    if len(calls) <= 1:
+        return [gpt_api_call(user_input, rule) for user_input, rule in calls]
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrent, len(calls))) as executor:
+        return list(executor.map(lambda call: gpt_api_call(*call), calls))
@@ -0,0 +1,250 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+"""
+Local stand-in for the OpenAI chat completions API.
+
+MockLLMServer answers POST /v1/chat/completions with canned task JSON chosen from
+the system prompt of each Prism operation (create, expand, combine, add step, add
+context, repair), so the task pipeline can be run and profiled without a paid
+endpoint. It supports streamed (server-sent events) and plain responses, a
+configurable delay before the first byte and between streamed chunks, and a share
+of malformed responses or server errors.
+
+Point the app at it with PRISM_OPENAI_BASE_URL (or LLM_API.configure_client):
+
+    python -m backend.MockServer --port 8765 --latency 0.3
+    PRISM_OPENAI_BASE_URL=http://127.0.0.1:8765/v1 PRISM_API_KEY=mock python Main.py
+"""
+
+
+def _task_steps(text):
+    """Return the step descriptions of the task JSON in an add_context prompt, if any."""
+    start = text.find("{")
+    try:
+        task, _ = json.JSONDecoder().raw_decode(text[start:]) if start != -1 else (None, 0)
+    except ValueError:
+        return []
+    return task.get("steps", []) if isinstance(task, dict) else []
+
+
+def canned_response(messages):
+    """
+    Return a plausible response to a Prism request.
+
+    Parameters:
+    messages (list): Chat messages; the system prompt selects the operation.
+
+    Returns:
+    str: A JSON object in the shape the operation asks for.
+    """
+    rule = messages[0].get("content", "") if messages else ""
+    user = messages[-1].get("content", "") if messages else ""
+
+    if "could not be used" in rule:
+        # Repair request: answer with the example structure it includes
+        rule = rule[rule.find("{"):]
+    if "step_to_expand" in rule or '"Steps": [{' in rule:
+        return json.dumps({"Steps": [{"Description": f"Sub-step {i + 1}"} for i in range(3)]})
+    if "steps_to_combine" in rule or '"Step":' in rule:
+        return json.dumps({"Step": "Combined step"})
+    if "steps_to_add" in rule or '"step":' in rule:
+        return json.dumps({"step": "Added step"})
+    if "updated title" in rule or "estimatedTotalTime" in rule:
+        steps = _task_steps(user) or ["Updated step"]
+        return json.dumps({
+            "title": "Updated task",
+            "description": "Updated with the new context",
+            "steps": steps,
+            "estimatedTotalTime": "2 hours",
+        })
+    return json.dumps({
+        "Title": user[:60] or "New task",
+        "Description": "Created by the mock server",
+        "Steps": [f"Step {i + 1}" for i in range(5)],
+        "Estimated Total Time": "1 hour",
+    })
+
+
+def _malformed(content, rng):
+    """Return a broken variant of a JSON response: prose-wrapped, trailing comma or truncated."""
+    kind = rng.randrange(3)
+    if kind == 0:
+        return "Sure! Here is the JSON:\n```json\n" + content + "\n```"
+    if kind == 1:
+        return content[:-1] + ",}"
+    return content[:len(content) // 2]
+
+
+class MockLLMServer:
+    """
+    OpenAI-compatible chat completions server running on a background thread.
+
+    Attributes:
+    latency (float): Seconds to wait before answering.
+    chunk_delay (float): Seconds between streamed chunks.
+    chunk_size (int): Characters per streamed chunk.
+    malformed_rate (float): Share of responses that are broken JSON.
+    error_rate (float): Share of requests answered with HTTP 500.
+    responder (callable): messages -> response text; canned_response by default.
+    requests (int): Requests answered so far.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, chunk_delay=0.0, chunk_size=8,
+                 malformed_rate=0.0, error_rate=0.0, responder=None, seed=None):
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+        self.malformed_rate = malformed_rate
+        self.error_rate = error_rate
+        self.responder = responder or canned_response
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL to configure the OpenAI client with."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """Serve requests on a daemon thread and return self."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _decide(self):
+        """Return 'error', 'malformed' or 'ok' for the next request."""
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+        if roll < self.error_rate:
+            return "error"
+        if roll < self.error_rate + self.malformed_rate:
+            return "malformed"
+        return "ok"
+
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; don't let them wait for ACKs
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                return
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self._send_json(400, {"error": {"message": "Request body is not JSON"}})
+                return
+
+            outcome = server._decide()
+            if server.latency:
+                time.sleep(server.latency)
+            if outcome == "error":
+                self._send_json(500, {"error": {"message": "Mock server error", "type": "server_error"}})
+                return
+
+            content = server.responder(payload.get("messages", []))
+            if outcome == "malformed":
+                with server._lock:
+                    content = _malformed(content, server._rng)
+
+            model = payload.get("model", "mock")
+            if payload.get("stream"):
+                self._stream(model, content)
+            else:
+                self._send_json(200, {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                })
+
+        def _send_json(self, status, data):
+            raw = json.dumps(data).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def _stream(self, model, content):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            def event(delta, finish_reason=None):
+                chunk = {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }
+                self.wfile.write(b"data: " + json.dumps(chunk).encode("utf-8") + b"\n\n")
+                self.wfile.flush()
+
+            event({"role": "assistant", "content": ""})
+            for i in range(0, len(content), server.chunk_size):
+                if i and server.chunk_delay:
+                    time.sleep(server.chunk_delay)
+                event({"content": content[i:i + server.chunk_size]})
+            event({}, "stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve canned Prism responses on an OpenAI-compatible endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each response")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="seconds between streamed chunks")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of broken JSON responses")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of HTTP 500 responses")
+    args = parser.parse_args()
+
+    mock = MockLLMServer(args.host, args.port, args.latency, args.chunk_delay,
+                         malformed_rate=args.malformed_rate, error_rate=args.error_rate)
+    print(f"Mock LLM server listening on {mock.url}")
+    try:
+        mock._httpd.serve_forever()
+    except KeyboardInterrupt:
+        mock.stop()
@@ -0,0 +1,176 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+"""
+Durable queue of LLM operations that have not been applied yet.
+
+Every LLM-backed request is recorded here before it is sent and removed once its
+response has been applied (or rejected for good). A request whose call failed
+because the API could not be reached stays in the queue and is retried with an
+exponential backoff; requests left over from a previous session are sent again at
+start-up. Nothing the user typed is lost while offline.
+
+The queue is a small JSON file (data/llm_queue.json), rewritten atomically on
+every change.
+"""
+
+if getattr(sys, 'frozen', False):
+    # Determine base directory when running inside a PyInstaller bundle.
+    BASE_DIR = sys._MEIPASS
+else:
+    # Determine base directory when running normally.
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+QUEUE_FILE = os.path.join(BASE_DIR, "..", "data", "llm_queue.json")
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 300.0
+
+_queue = None
+
+
+def get_queue():
+    """
+    Return the process-wide operation queue, loading it on first use.
+
+    Returns:
+    OfflineQueue: The shared queue.
+    """
+    global _queue
+    if _queue is None:
+        _queue = OfflineQueue(QUEUE_FILE)
+    return _queue
+
+
+class OfflineQueue:
+    """
+    Pending LLM requests, persisted to a JSON file.
+
+    Each entry is a dict with 'id', 'request' (as built by a Tasks.prepare_*
+    function), 'attempts', 'next_attempt' (a time.time() value) and 'error'.
+
+    Attributes:
+    path (str): The queue file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not read the LLM queue {self.path}: {e}")
+            return []
+        return entries if isinstance(entries, list) else []
+
+    def _save(self):
+        """Atomically replace the queue file with the current entries."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def add(self, request):
+        """
+        Record a request before it is sent.
+
+        Parameters:
+        request (dict): Request from a Tasks.prepare_* function.
+
+        Returns:
+        str: The entry ID.
+        """
+        entry = {
+            "id": uuid.uuid4().hex[:12],
+            # Copy so later changes to the live request (streaming state) are not recorded
+            "request": json.loads(json.dumps(request)),
+            "attempts": 0,
+            "next_attempt": 0.0,
+            "error": None,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self._save()
+        return entry["id"]
+
+    def remove(self, entry_id):
+        """Drop an entry whose response was applied or rejected."""
+        with self._lock:
+            before = len(self._entries)
+            self._entries = [entry for entry in self._entries if entry["id"] != entry_id]
+            if len(self._entries) != before:
+                self._save()
+
+    def defer(self, entry_id, error):
+        """
+        Schedule another attempt of an entry whose call could not reach the API.
+
+        Parameters:
+        entry_id (str): The entry to retry.
+        error (str): Why the attempt failed.
+
+        Returns:
+        float: Seconds until the next attempt, or None if there is no such entry.
+        """
+        with self._lock:
+            for entry in self._entries:
+                if entry["id"] == entry_id:
+                    entry["attempts"] += 1
+                    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (entry["attempts"] - 1))
+                    delay *= 1 + random.random() / 4
+                    entry["next_attempt"] = time.time() + delay
+                    entry["error"] = error
+                    self._save()
+                    return delay
+        return None
+
+    def entries(self):
+        """Return copies of all entries, oldest first."""
+        with self._lock:
+            return [dict(entry) for entry in self._entries]
+
+    def due(self, now=None, force=False, exclude=()):
+        """
+        Return the entries whose next attempt is due, oldest first.
+
+        Parameters:
+        now (float or None): Current time.time(); the actual time if None.
+        force (bool): Return every entry, e.g. once the API is reachable again.
+        exclude (collection): Entry IDs to leave out, such as requests in flight.
+        """
+        now = time.time() if now is None else now
+        return [
+            entry for entry in self.entries()
+            if entry["id"] not in exclude and (force or entry["next_attempt"] <= now)
+        ]
+
+    def next_due(self, now=None, exclude=()):
+        """
+        Return the seconds until the earliest entry is due (0 if overdue), or None if there is none.
+
+        Parameters:
+        now (float or None): Current time.time(); the actual time if None.
+        exclude (collection): Entry IDs to leave out, such as requests in flight.
+        """
+        now = time.time() if now is None else now
+        times = [entry["next_attempt"] for entry in self.entries() if entry["id"] not in exclude]
+        if not times:
+            return None
+        return max(0.0, min(times) - now)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
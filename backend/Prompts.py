@@ -0,0 +1,59 @@
+import json
+
+"""
+Compact serialization of task data for LLM prompts.
+
+Prompts only carry the fields the model needs (title, description, expected time
+and the step descriptions), as JSON without whitespace. Bookkeeping such as IDs,
+priority, category and logged durations is left out, so a task's prompt does not
+grow as time is logged against it, and overly long text fields are clipped.
+
+estimate_tokens() gives a cheap size estimate (about four characters per token)
+that is logged for every API call.
+"""
+
+# Task fields sent to the model, in prompt order
+TASK_PROMPT_FIELDS = ("title", "description", "expectedTime")
+MAX_TEXT_CHARS = 400
+
+
+def compact_json(value):
+    """Return value as JSON with no insignificant whitespace."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _clip(text):
+    """Shorten a text field to MAX_TEXT_CHARS characters."""
+    text = str(text)
+    if len(text) <= MAX_TEXT_CHARS:
+        return text
+    return text[:MAX_TEXT_CHARS - 1] + "…"
+
+
+def task_prompt(task, fields=TASK_PROMPT_FIELDS):
+    """
+    Return the parts of a task worth sending to the model.
+
+    Parameters:
+    task (dict): A task as stored in the project file.
+    fields (tuple): Top-level fields to include when present.
+
+    Returns:
+    dict: The selected fields plus 'steps' as a list of step descriptions.
+    """
+    payload = {field: _clip(task[field]) for field in fields if task.get(field) not in (None, "")}
+    payload["steps"] = [_clip(step.get("description", "")) for step in task.get("steps", [])]
+    return payload
+
+
+def estimate_tokens(text):
+    """
+    Return a rough token count for a prompt string.
+
+    Parameters:
+    text (str): Prompt text.
+
+    Returns:
+    int: Estimated tokens, at about four characters per token.
+    """
+    return (len(text) + 3) // 4
@@ -0,0 +1,199 @@
+import json
+import re
+
+"""
+Parsing and validation of LLM responses, one schema per operation.
+
+Every LLM-backed operation in Tasks.py gets its response through parse_response(),
+which
+- extracts the first JSON object from the text, tolerating code fences, leading
+  prose and trailing commas;
+- checks it against the operation's schema, matching keys regardless of case,
+  spaces and underscores ("Estimated Total Time" == "estimatedTotalTime");
+- returns it normalized to the keys the rest of the code uses.
+
+When a response does not pass, repair_request() builds a single follow-up request
+asking the model to fix its own output. Callers make at most one such retry and
+report it in the result.
+"""
+
+# Example output for each operation, used in repair requests
+SCHEMA_HINTS = {
+    "create_task": '{"Title": "...", "Description": "...", "Steps": ["...", "..."], "Estimated Total Time": "..."}',
+    "expand_step": '{"Steps": [{"Description": "..."}, {"Description": "..."}]}',
+    "combine_steps": '{"Step": "..."}',
+    "add_step": '{"step": "..."}',
+    "add_context": '{"title": "...", "description": "...", "steps": ["...", "..."], "estimatedTotalTime": "..."}',
+}
+
+REPAIR_RULE = (
+    "The previous response could not be used. Reply with only a corrected JSON object, "
+    "with no explanation and no code fences, keeping the original content but matching this structure: "
+)
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_decoder = json.JSONDecoder()
+
+# Totals since start-up, for diagnostics
+_stats = {"parsed": 0, "repaired": 0, "failed": 0, "retries": 0}
+
+
+def extract_json(text):
+    """
+    Return the first JSON object in a response.
+
+    Parameters:
+    text (str or dict): The raw response; dicts are returned as they are.
+
+    Returns:
+    dict: The decoded object.
+
+    Raises:
+    ValueError: If no JSON object can be decoded.
+    """
+    if isinstance(text, dict):
+        return text
+    if not isinstance(text, str):
+        raise ValueError("The response is empty.")
+
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object found in the response.")
+
+    candidate = text[start:]
+    for attempt in (candidate, _TRAILING_COMMA.sub(r"\1", candidate)):
+        try:
+            value, _ = _decoder.raw_decode(attempt)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value
+    raise ValueError("The JSON object in the response is malformed.")
+
+
+def _normalize_key(key):
+    return re.sub(r"[^a-z0-9]", "", str(key).lower())
+
+
+def _field(data, name, required=True):
+    """Return a member by tolerant key match; raise ValueError if a required one is missing."""
+    wanted = _normalize_key(name)
+    for key, value in data.items():
+        if _normalize_key(key) == wanted:
+            return value
+    if required:
+        raise ValueError(f"The response has no '{name}'.")
+    return None
+
+
+def _text(value, name):
+    """Return a step-like value as text: a string, or an object with a description."""
+    if isinstance(value, dict):
+        value = _field(value, "description", required=False) or _field(value, "step", required=False)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"'{name}' must be a non-empty string.")
+    return value.strip()
+
+
+def _text_list(value, name):
+    if not isinstance(value, list) or not value:
+        raise ValueError(f"'{name}' must be a non-empty list.")
+    return [_text(item, name) for item in value]
+
+
+def _optional_text(data, name, default=""):
+    value = _field(data, name, required=False)
+    return value.strip() if isinstance(value, str) else default
+
+
+def _create_task(data):
+    return {
+        "Title": _text(_field(data, "Title"), "Title"),
+        "Description": _optional_text(data, "Description"),
+        "Steps": _text_list(_field(data, "Steps"), "Steps"),
+        "Estimated Total Time": _optional_text(data, "Estimated Total Time"),
+    }
+
+
+def _expand_step(data):
+    return {"Steps": _text_list(_field(data, "Steps"), "Steps")}
+
+
+def _combine_steps(data):
+    return {"Step": _text(_field(data, "Step"), "Step")}
+
+
+def _add_step(data):
+    return {"step": _text(_field(data, "step"), "step")}
+
+
+def _add_context(data):
+    return {
+        "title": _optional_text(data, "title", None),
+        "description": _optional_text(data, "description", None),
+        "steps": _text_list(_field(data, "steps"), "steps"),
+        "estimatedTotalTime": _optional_text(data, "estimatedTotalTime", None),
+    }
+
+
+SCHEMAS = {
+    "create_task": _create_task,
+    "expand_step": _expand_step,
+    "combine_steps": _combine_steps,
+    "add_step": _add_step,
+    "add_context": _add_context,
+}
+
+
+def parse_response(operation, text):
+    """
+    Extract and validate the response to an operation.
+
+    Parameters:
+    operation (str): Operation name, a key of SCHEMAS.
+    text (str): The raw response.
+
+    Returns:
+    dict: {'data': normalized dict or None, 'error': message or None, 'retries': 0}.
+    """
+    try:
+        return {"data": SCHEMAS[operation](extract_json(text)), "error": None, "retries": 0}
+    except ValueError as e:
+        return {"data": None, "error": str(e), "retries": 0}
+
+
+def repair_request(operation, text, error):
+    """
+    Build the follow-up request asking the model to fix an unusable response.
+
+    Parameters:
+    operation (str): Operation name, a key of SCHEMAS.
+    text (str): The unusable response.
+    error (str): Why it was rejected.
+
+    Returns:
+    tuple: (user_input, rule) for the repair call.
+    """
+    return f"Problem: {error}\nResponse:\n{text}", REPAIR_RULE + SCHEMA_HINTS[operation]
+
+
+def record(result):
+    """Count a final parse result in the totals and return it."""
+    if result["data"] is None:
+        _stats["failed"] += 1
+    elif result["retries"]:
+        _stats["repaired"] += 1
+    else:
+        _stats["parsed"] += 1
+    _stats["retries"] += result["retries"]
+    return result
+
+
+def stats():
+    """
+    Return parse totals since start-up.
+
+    Returns:
+    dict: 'parsed' (first try), 'repaired', 'failed' and 'retries' spent.
+    """
+    return dict(_stats)
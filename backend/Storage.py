@@ -0,0 +1,465 @@
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+
+from . import Activity
+from .Journal import load_tasks, append_ops, compact, is_current
+from .Writer import get_writer
+
+"""
+Storage backends for task lists and activity.
+
+JsonBackend keeps the original file layout: *_Task_Data.json snapshots with their
+operation journals, and the month-partitioned activity log. SqliteBackend keeps the
+same data in one local SQLite database with indexes on task (project, category,
+position), step (task, position) and activity (project, timestamp), so reorders,
+step edits and time logging are small transactional row updates and daily activity
+totals come from a GROUP BY. Both backends hand their writes to the background
+writer; SQLite changes queued together are committed in a single transaction.
+
+The backend is chosen with the PRISM_STORAGE environment variable ("json", the
+default, or "sqlite"). Existing JSON data is imported with:
+
+    python -m backend.Storage migrate [database path]
+"""
+
+DATA_DIR = os.path.join(Activity.BASE_DIR, "..", "data")
+DATABASE_FILE = os.path.join(DATA_DIR, "prism.db")
+
+# Column-backed task fields; anything else is kept in the 'extra' JSON column
+TASK_COLUMNS = ("title", "description", "priority", "expectedTime", "elapsedTime")
+
+_backend = None
+
+
+def project_name(tasks_file):
+    """Return the project name of a *_Task_Data.json path, e.g. 'Prism'."""
+    match = re.search(r'([^\\/]+)_Task_Data\.json$', tasks_file, re.IGNORECASE)
+    return match.group(1) if match else os.path.basename(tasks_file)
+
+
+def duration_seconds(duration):
+    """Convert an 'H:MM:SS' or 'MM:SS' activity duration to whole seconds."""
+    try:
+        parts = [int(part) for part in str(duration).strip().split(":")]
+    except ValueError:
+        return 0
+    if len(parts) == 2:
+        return parts[0] * 60 + parts[1]
+    if len(parts) == 3:
+        return parts[0] * 3600 + parts[1] * 60 + parts[2]
+    return 0
+
+
+def get_backend():
+    """
+    Return the process-wide storage backend selected by PRISM_STORAGE.
+
+    Returns:
+    JsonBackend or SqliteBackend: The active backend.
+    """
+    global _backend
+    if _backend is None:
+        if os.environ.get("PRISM_STORAGE", "json").lower() == "sqlite":
+            _backend = SqliteBackend(os.environ.get("PRISM_DATABASE", DATABASE_FILE))
+        else:
+            _backend = JsonBackend()
+    return _backend
+
+
+def set_backend(backend):
+    """Replace the process-wide storage backend."""
+    global _backend
+    _backend = backend
+
+
+class JsonBackend:
+    """Task snapshots with journals, and month-partitioned JSON Lines activity."""
+
+    def __init__(self, activity_dir=Activity.ACTIVITY_DIR):
+        self.activity_dir = activity_dir
+
+    def load_tasks(self, tasks_file):
+        """Return a project's full task list."""
+        return load_tasks(tasks_file)
+
+    def is_current(self, tasks_file):
+        """Return True if the project files are unchanged since they were last loaded or written."""
+        return is_current(tasks_file)
+
+    def apply(self, tasks_file, ops, tasks):
+        """Persist operations that were already applied to `tasks`."""
+        append_ops(tasks_file, ops, tasks)
+
+    def save_tasks(self, tasks_file, tasks):
+        """Persist a project's full task list in one write."""
+        compact(tasks_file, tasks)
+
+    def append_activity(self, entry):
+        """Record one activity entry."""
+        Activity.append_activity(entry, self.activity_dir)
+
+    def activity_signature(self):
+        """Return a value that changes whenever activity is recorded."""
+        return Activity.activity_signature(self.activity_dir)
+
+    def activity_records(self, start_date=None, end_date=None, project=None):
+        """
+        Yield (project, timestamp, duration) rows overlapping a date range.
+
+        Rows are pruned to the overlapping month partitions, not to exact timestamps.
+        """
+        for item in Activity.iter_activity(self.activity_dir, start_date, end_date, project):
+            yield item.get('project'), item.get('timestamp'), item.get('duration')
+
+
+class _PendingSqlWrite:
+    """Task operations and activity rows queued for one SQLite database."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.ops = []
+        self.activity = []
+
+    def write(self):
+        backend = self.backend
+        with backend._lock, backend._conn:
+            for project, op in self.ops:
+                backend._apply_op(project, op)
+            for entry in self.activity:
+                backend._insert_activity(entry)
+
+
+class SqliteBackend:
+    """All projects and activity in a single indexed SQLite database."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            project TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            category TEXT,
+            title TEXT,
+            description TEXT,
+            priority INTEGER,
+            expectedTime TEXT,
+            elapsedTime INTEGER,
+            extra TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_project_position ON tasks (project, position);
+        CREATE INDEX IF NOT EXISTS idx_tasks_project_category_position ON tasks (project, category, position);
+
+        CREATE TABLE IF NOT EXISTS steps (
+            id TEXT PRIMARY KEY,
+            task_id TEXT NOT NULL REFERENCES tasks (id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            description TEXT,
+            duration INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_steps_task_position ON steps (task_id, position);
+
+        CREATE TABLE IF NOT EXISTS activity (
+            id INTEGER PRIMARY KEY,
+            project TEXT,
+            title TEXT,
+            description TEXT,
+            timestamp TEXT NOT NULL,
+            seconds INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_activity_project_timestamp ON activity (project, timestamp);
+    """
+
+    def __init__(self, database_file=DATABASE_FILE):
+        self.database_file = database_file
+        self._lock = threading.RLock()
+        # Counts inserted activity rows, so readers can tell when to re-read
+        self._activity_version = 0
+        self._conn = sqlite3.connect(database_file, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def _submit(self, update):
+        """Merge a change into this database's pending write batch."""
+        get_writer().submit(self.database_file, lambda: _PendingSqlWrite(self), update)
+
+    def flush(self):
+        """Commit any queued writes now."""
+        get_writer().flush(self.database_file)
+
+    # Tasks
+
+    def load_tasks(self, tasks_file):
+        """Return a project's full task list in position order."""
+        project = project_name(tasks_file)
+        self.flush()
+        with self._lock:
+            task_rows = self._conn.execute(
+                "SELECT * FROM tasks WHERE project = ? ORDER BY position", (project,)
+            ).fetchall()
+            step_rows = self._conn.execute(
+                "SELECT s.* FROM steps s JOIN tasks t ON t.id = s.task_id "
+                "WHERE t.project = ? ORDER BY s.task_id, s.position", (project,)
+            ).fetchall()
+
+        steps_by_task = {}
+        for row in step_rows:
+            steps_by_task.setdefault(row["task_id"], []).append(
+                {"id": row["id"], "description": row["description"], "duration": row["duration"]}
+            )
+        return [self._task_from_row(row, steps_by_task.get(row["id"], [])) for row in task_rows]
+
+    def _task_from_row(self, row, steps):
+        """Rebuild a task dict from its row and steps."""
+        task = json.loads(row["extra"]) if row["extra"] else {}
+        task.update({column: row[column] for column in TASK_COLUMNS})
+        task["id"] = row["id"]
+        task["category"] = row["category"]
+        task["steps"] = steps
+        return task
+
+    def _task_row(self, project, position, task):
+        """Return the column values for inserting a task."""
+        extra = {
+            key: value for key, value in task.items()
+            if key not in TASK_COLUMNS and key not in ("id", "category", "steps")
+        }
+        return (
+            task["id"], project, position, task.get("category"),
+            *(task.get(column) for column in TASK_COLUMNS),
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+        )
+
+    def _insert_task(self, project, position, task):
+        """Insert a task row and its steps."""
+        self._conn.execute(
+            "INSERT INTO tasks (id, project, position, category, title, description, "
+            "priority, expectedTime, elapsedTime, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            self._task_row(project, position, task),
+        )
+        self._insert_steps(task)
+
+    def _insert_steps(self, task):
+        """Insert all steps of a task."""
+        self._conn.executemany(
+            "INSERT INTO steps (id, task_id, position, description, duration) VALUES (?, ?, ?, ?, ?)",
+            [
+                (step["id"], task["id"], position, step.get("description"), int(step.get("duration", 0)))
+                for position, step in enumerate(task.get("steps", []))
+            ],
+        )
+
+    def _task_id_at(self, project, position):
+        """Return the ID of the task at a position in a project."""
+        row = self._conn.execute(
+            "SELECT id FROM tasks WHERE project = ? AND position = ?", (project, position)
+        ).fetchone()
+        if row is None:
+            raise IndexError(f"No task at position {position} in project '{project}'")
+        return row["id"]
+
+    def _shift(self, project, low, high, delta):
+        """Shift the positions of tasks in [low, high] by delta."""
+        self._conn.execute(
+            "UPDATE tasks SET position = position + ? WHERE project = ? AND position BETWEEN ? AND ?",
+            (delta, project, low, high),
+        )
+
+    def apply(self, tasks_file, ops, tasks):
+        """
+        Queue journal-style operations to be committed as row updates.
+
+        Parameters:
+        tasks_file (str): The project's *_Task_Data.json path, used as the project key.
+        ops (list): Operations already applied to `tasks`.
+        tasks (list): The full task list after the operations (unused; kept for interface parity).
+        """
+        project = project_name(tasks_file)
+        # Copy the operations so later in-place edits of the tasks cannot leak into them
+        queued = [(project, op) for op in json.loads(json.dumps(ops))]
+        self._submit(lambda pending: pending.ops.extend(queued))
+
+    def _apply_op(self, project, op):
+        """Translate one journal operation into SQL."""
+        kind = op["op"]
+        if kind == "insert":
+            self._shift(project, op["index"], sys.maxsize, 1)
+            self._insert_task(project, op["index"], op["task"])
+        elif kind == "remove":
+            task_id = self._task_id_at(project, op["index"])
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            self._shift(project, op["index"] + 1, sys.maxsize, -1)
+        elif kind == "move":
+            task_id = self._task_id_at(project, op["from"])
+            if op["from"] < op["to"]:
+                self._shift(project, op["from"] + 1, op["to"], -1)
+            else:
+                self._shift(project, op["to"], op["from"] - 1, 1)
+            self._conn.execute("UPDATE tasks SET position = ? WHERE id = ?", (op["to"], task_id))
+        elif kind == "swap":
+            a_id = self._task_id_at(project, op["a"])
+            b_id = self._task_id_at(project, op["b"])
+            self._conn.execute("UPDATE tasks SET position = ? WHERE id = ?", (op["b"], a_id))
+            self._conn.execute("UPDATE tasks SET position = ? WHERE id = ?", (op["a"], b_id))
+        elif kind == "set":
+            task_id = self._task_id_at(project, op["index"])
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            self._insert_task(project, op["index"], op["task"])
+        elif kind == "update":
+            task_id = self._task_id_at(project, op["index"])
+            row = self._conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+            task = self._task_from_row(row, [])
+            task.update(op["fields"])
+            self._conn.execute(
+                "UPDATE tasks SET category = ?, title = ?, description = ?, priority = ?, "
+                "expectedTime = ?, elapsedTime = ?, extra = ? WHERE id = ?",
+                self._task_row(project, op["index"], task)[3:] + (task_id,),
+            )
+        elif kind == "steps":
+            task_id = self._task_id_at(project, op["index"])
+            self._conn.execute("DELETE FROM steps WHERE task_id = ?", (task_id,))
+            self._insert_steps({"id": task_id, "steps": op["steps"]})
+        elif kind == "insert_step":
+            task_id = self._task_id_at(project, op["index"])
+            step = op["step"]
+            self._conn.execute(
+                "UPDATE steps SET position = position + 1 WHERE task_id = ? AND position >= ?",
+                (task_id, op["at"]),
+            )
+            self._conn.execute(
+                "INSERT INTO steps (id, task_id, position, description, duration) VALUES (?, ?, ?, ?, ?)",
+                (step["id"], task_id, op["at"], step.get("description"), int(step.get("duration", 0))),
+            )
+        elif kind == "step":
+            task_id = self._task_id_at(project, op["index"])
+            fields = op["fields"]
+            assignments = ", ".join(f"{key} = ?" for key in fields if key in ("description", "duration"))
+            if assignments:
+                self._conn.execute(
+                    f"UPDATE steps SET {assignments} WHERE task_id = ? AND position = ?",
+                    (*(fields[key] for key in fields if key in ("description", "duration")), task_id, op["step"]),
+                )
+        else:
+            raise ValueError(f"Unknown journal operation '{kind}'")
+
+    def save_tasks(self, tasks_file, tasks):
+        """Replace a project's full task list in one transaction."""
+        project = project_name(tasks_file)
+        self.flush()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tasks WHERE project = ?", (project,))
+            for position, task in enumerate(tasks):
+                self._insert_task(project, position, task)
+
+    def is_current(self, tasks_file):
+        """Return True; the database is only changed through this backend."""
+        return True
+
+    # Activity
+
+    def append_activity(self, entry):
+        """Queue one activity entry as a single row insert."""
+        queued = dict(entry)
+        self._submit(lambda pending: pending.activity.append(queued))
+
+    def _insert_activity(self, entry):
+        """Insert one activity row, converting its duration to seconds."""
+        self._conn.execute(
+            "INSERT INTO activity (project, title, description, timestamp, seconds) VALUES (?, ?, ?, ?, ?)",
+            (
+                entry.get("project"), entry.get("title"), entry.get("description"),
+                entry["timestamp"], duration_seconds(entry.get("duration")),
+            ),
+        )
+        self._activity_version += 1
+
+    def activity_signature(self):
+        """Return a value that changes whenever activity is recorded."""
+        self.flush()
+        return self._activity_version
+
+    def has_activity(self):
+        """Return True if any activity has been recorded."""
+        self.flush()
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM activity LIMIT 1").fetchone() is not None
+
+    def activity_records(self, start_date=None, end_date=None, project=None):
+        """
+        Yield per-day (project, timestamp, seconds) totals within a date range.
+
+        Totals are computed by SQLite with a GROUP BY over the (project, timestamp)
+        index; each row is stamped at midnight of its day, which keeps every
+        day-aligned bucket in Graph.aggregate_nodes unchanged.
+        """
+        clauses, params = [], []
+        if project is not None:
+            clauses.append("project = ?")
+            params.append(project)
+        if start_date is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start_date.strftime("%Y-%m-%d %H:%M:%S"))
+        if end_date is not None:
+            clauses.append("timestamp <= ?")
+            params.append(end_date.strftime("%Y-%m-%d %H:%M:%S"))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT project, date(timestamp) AS day, SUM(seconds) AS seconds FROM activity {where} "
+                "GROUP BY project, day ORDER BY day",
+                params,
+            ).fetchall()
+        for row in rows:
+            yield row["project"], f"{row['day']} 00:00:00", row["seconds"]
+
+
+def migrate_json_to_sqlite(data_dir=DATA_DIR, database_file=DATABASE_FILE):
+    """
+    Import every *_Task_Data.json project and the activity log into SQLite.
+
+    Projects are replaced wholesale, so the import can be re-run; activity rows are
+    only imported into an empty activity table.
+
+    Parameters:
+    data_dir (str): Directory holding the project files and activity partitions.
+    database_file (str): Path of the SQLite database to create or update.
+    """
+    from .TaskStore import TaskStore
+
+    json_backend = JsonBackend(os.path.join(data_dir, "activity"))
+    sqlite_backend = SqliteBackend(database_file)
+
+    # Match the suffix case-insensitively, like project_name(); e.g. Masters_Task_data.json
+    tasks_files = sorted(
+        os.path.join(data_dir, name) for name in os.listdir(data_dir)
+        if name.lower().endswith("_task_data.json")
+    )
+    for tasks_file in tasks_files:
+        # Loading through a TaskStore replays the journal and assigns any missing IDs
+        store = TaskStore(tasks_file, json_backend)
+        sqlite_backend.save_tasks(tasks_file, store.tasks)
+        print(f"✅ Imported {len(store.tasks)} tasks from {tasks_file}")
+
+    if sqlite_backend.has_activity():
+        print("Activity table already populated; skipping activity import.")
+        return
+
+    count = 0
+    with sqlite_backend._lock, sqlite_backend._conn:
+        for entry in Activity.iter_activity(json_backend.activity_dir):
+            sqlite_backend._insert_activity(entry)
+            count += 1
+    print(f"✅ Imported {count} activity entries into {database_file}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 2 and sys.argv[1] == "migrate":
+        migrate_json_to_sqlite(database_file=sys.argv[2] if len(sys.argv) > 2 else DATABASE_FILE)
+    else:
+        print("Usage: python -m backend.Storage migrate [database path]")
@@ -0,0 +1,422 @@
+from .Storage import get_backend
+import uuid
+
+"""
+In-memory, indexed view of a project's task list.
+
+A TaskStore loads a *_Task_Data.json project once (snapshot plus journal) and keeps
+hash indexes so tasks and steps can be found without scanning:
+
+- task id -> task, and step id -> owning task
+- (title, description) -> task
+- category -> ordered list of tasks in that category
+- task -> {step description: step index} and {step id: step index}
+
+Loading and persistence go through the configured storage backend (see Storage.py).
+
+Every task and step carries a persistent "id". Project files written before IDs
+existed are migrated the first time they are loaded: missing IDs are assigned and
+the snapshot is compacted once so they stick.
+
+Every mutation goes through the store, which updates the indexes and appends the
+matching operation to the project's journal.
+
+Stores stay resident for the life of the process. get_store() only checks the
+backend's cheap change signature (file mtime and size for JSON projects) and
+reloads a store when its files were changed outside the app;
+reload_changed_stores() does the same for every resident store and reports which
+categories actually differ, for the file watcher in Main.py. Each store carries a
+version number that changes on every reload and mutation, so views can cache
+what they derive from it.
+"""
+
+# One store per project file, shared by Tasks.py and the QML backend
+_stores = {}
+
+
+def new_id():
+    """Return a new short, random ID for a task or step."""
+    return uuid.uuid4().hex[:12]
+
+
+def get_store(tasks_file):
+    """
+    Return the shared TaskStore for a project file, loading it on first use
+    from the configured storage backend and reloading it if the file was
+    changed on disk by someone else.
+
+    Parameters:
+    tasks_file (str): Path to the *_Task_Data.json file.
+
+    Returns:
+    TaskStore: The resident store for that file.
+    """
+    store = _stores.get(tasks_file)
+    if store is None:
+        store = TaskStore(tasks_file)
+        _stores[tasks_file] = store
+    elif not store.backend.is_current(tasks_file):
+        store.reload()
+    return store
+
+
+def reload_changed_stores():
+    """
+    Reload every resident store whose files were changed outside the app.
+
+    Returns:
+    dict: tasks file -> set of categories whose tasks differ after the reload.
+        Stores that were unchanged, or reloaded to identical content, are left out.
+    """
+    changed = {}
+    for tasks_file, store in _stores.items():
+        categories = store.sync()
+        if categories:
+            changed[tasks_file] = categories
+    return changed
+
+
+class TaskStore:
+    """
+    Resident task list for one project with lookup indexes.
+
+    Attributes:
+    tasks_file (str): Path to the project's snapshot file.
+    backend (JsonBackend or SqliteBackend): Where the tasks are loaded from and persisted to.
+    tasks (list): The full task list in file order.
+    version (int): Incremented on every reload and mutation.
+    """
+
+    def __init__(self, tasks_file, backend=None):
+        self.tasks_file = tasks_file
+        self.backend = backend or get_backend()
+        self.version = 0
+        self.reload()
+
+    def reload(self):
+        """Re-read the project from disk, migrate missing IDs and rebuild all indexes."""
+        self.tasks = self.backend.load_tasks(self.tasks_file)
+
+        migrated = [task for task in self.tasks if _ensure_ids(task)]
+        if migrated:
+            # One-time migration: persist the new IDs in a fresh snapshot
+            self.backend.save_tasks(self.tasks_file, self.tasks)
+            print(f"Assigned IDs to {len(migrated)} tasks in {self.tasks_file}")
+
+        self._reindex()
+        self.version += 1
+
+    def sync(self):
+        """
+        Reload the project if its files changed on disk and diff the result.
+
+        Returns:
+        set: Categories whose task lists differ from before the reload; empty if
+            the files were unchanged.
+        """
+        if self.backend.is_current(self.tasks_file):
+            return set()
+
+        before = {category: list(tasks) for category, tasks in self._by_category.items()}
+        self.reload()
+        after = self._by_category
+        return {
+            category for category in set(before) | set(after)
+            if before.get(category, []) != after.get(category, [])
+        }
+
+    def _reindex(self):
+        """Rebuild every index from the full task list."""
+        self._positions = {}
+        self._by_id = {}
+        self._by_key = {}
+        self._by_category = {}
+        self._steps = {}
+        self._step_ids = {}
+        self._step_owner = {}
+        for position, task in enumerate(self.tasks):
+            self._add_to_indexes(task, position)
+
+    def _add_to_indexes(self, task, position):
+        """Index a task at the given full-list position."""
+        self._positions[task["id"]] = position
+        self._by_id[task["id"]] = task
+        # Keep the first task for duplicate keys, as the old linear scans did
+        self._by_key.setdefault((task.get("title"), task.get("description")), task)
+        self._by_category.setdefault(task.get("category"), []).append(task)
+        self._index_steps(task)
+
+    def _index_steps(self, task):
+        """Rebuild the step indexes of a single task."""
+        for step_id in self._step_ids.get(task["id"], {}):
+            self._step_owner.pop(step_id, None)
+
+        by_description = {}
+        by_id = {}
+        for i, step in enumerate(task.get("steps", [])):
+            by_description.setdefault(step.get("description"), i)
+            by_id[step["id"]] = i
+            self._step_owner[step["id"]] = task
+        self._steps[task["id"]] = by_description
+        self._step_ids[task["id"]] = by_id
+
+    def _journal(self, ops):
+        """Persist operations that were already applied to self.tasks."""
+        self.version += 1
+        self.backend.apply(self.tasks_file, ops, self.tasks)
+
+    # Lookups
+
+    def get(self, task_id):
+        """
+        Return the task with the given ID, or None.
+
+        Parameters:
+        task_id (str): Persistent task ID.
+        """
+        return self._by_id.get(task_id)
+
+    def find_step(self, step_id):
+        """
+        Return the task owning a step and the step's index within it.
+
+        Parameters:
+        step_id (str): Persistent step ID.
+
+        Returns:
+        tuple: (task, step index), or (None, -1) if no task has that step.
+        """
+        task = self._step_owner.get(step_id)
+        if task is None:
+            return None, -1
+        return task, self._step_ids[task["id"]][step_id]
+
+    def find(self, title, description):
+        """
+        Return the task with the given title and description, or None.
+
+        Parameters:
+        title (str): Task title.
+        description (str): Task description.
+        """
+        return self._by_key.get((title, description))
+
+    def category(self, category):
+        """
+        Return the tasks of a category in file order.
+
+        Parameters:
+        category (str): 'idea', 'dev' or 'rlty'.
+
+        Returns:
+        list: A new list of the category's task dicts.
+        """
+        return list(self._by_category.get(category, []))
+
+    def position(self, task):
+        """Return the task's index in the full task list."""
+        return self._positions[task["id"]]
+
+    def step_index(self, task, description):
+        """
+        Return the index of the first step of a task with the given description.
+
+        Parameters:
+        task (dict): A task held by this store.
+        description (str): Step description to look up.
+
+        Returns:
+        int: The step index, or -1 if the task has no such step.
+        """
+        return self._steps.get(task["id"], {}).get(description, -1)
+
+    # Mutations
+
+    def insert(self, task, index=None):
+        """
+        Insert a new task into the full list, appending when index is None or invalid.
+
+        Parameters:
+        task (dict): The task to insert.
+        index (int or None): Target position in the full task list.
+        """
+        _ensure_ids(task)
+        if index is None or not 0 <= index <= len(self.tasks):
+            index = len(self.tasks)
+        self.tasks.insert(index, task)
+
+        if index == len(self.tasks) - 1:
+            self._add_to_indexes(task, index)
+        else:
+            self._reindex()
+
+        self._journal([{"op": "insert", "index": index, "task": task}])
+
+    def swap_in_category(self, category, from_index, to_index):
+        """
+        Swap two tasks identified by their positions within a category.
+
+        Parameters:
+        category (str): The category both tasks belong to.
+        from_index (int): Position of the first task within the category.
+        to_index (int): Position of the second task within the category.
+
+        Returns:
+        bool: False if either index is out of range.
+        """
+        members = self._by_category.get(category, [])
+        if not (0 <= from_index < len(members)) or not (0 <= to_index < len(members)):
+            return False
+
+        first, second = members[from_index], members[to_index]
+        a, b = self.position(first), self.position(second)
+
+        self.tasks[a], self.tasks[b] = second, first
+        members[from_index], members[to_index] = second, first
+        self._positions[first["id"]], self._positions[second["id"]] = b, a
+
+        self._journal([{"op": "swap", "a": a, "b": b}])
+        return True
+
+    def move_to_category(self, from_category, index, to_category):
+        """
+        Move a task to the end of the list under a new category.
+
+        Parameters:
+        from_category (str): The task's current category.
+        index (int): Position of the task within from_category.
+        to_category (str): The category to move the task to.
+
+        Returns:
+        dict: The moved task.
+        """
+        members = self._by_category.get(from_category, [])
+        if index < 0 or index >= len(members):
+            raise IndexError(f"Index {index} out of range for category '{from_category}' with {len(members)} tasks")
+
+        task = members[index]
+        source = self.position(task)
+        last = len(self.tasks) - 1
+
+        self.tasks.append(self.tasks.pop(source))
+        task["category"] = to_category
+        self._reindex()
+
+        self._journal([
+            {"op": "move", "from": source, "to": last},
+            {"op": "update", "index": last, "fields": {"category": to_category}},
+        ])
+        return task
+
+    def replace(self, task, new_task):
+        """
+        Replace a task with a new task dict at the same position, keeping its ID.
+
+        Parameters:
+        task (dict): A task held by this store.
+        new_task (dict): The replacement.
+        """
+        new_task["id"] = task["id"]
+        _ensure_ids(new_task)
+        position = self.position(task)
+        self.tasks[position] = new_task
+        self._reindex()
+        self._journal([{"op": "set", "index": position, "task": new_task}])
+
+    def remove(self, task):
+        """
+        Delete a task from the project.
+
+        Parameters:
+        task (dict): A task held by this store.
+        """
+        position = self.position(task)
+        del self.tasks[position]
+        self._reindex()
+        self._journal([{"op": "remove", "index": position}])
+
+    def update_task(self, task, fields):
+        """
+        Update top-level fields of a task in place.
+
+        Parameters:
+        task (dict): A task held by this store.
+        fields (dict): Field values to set on the task.
+        """
+        task.update(fields)
+        if {"title", "description", "category"} & set(fields):
+            self._reindex()
+        self._journal([{"op": "update", "index": self.position(task), "fields": fields}])
+
+    def set_steps(self, task, steps):
+        """
+        Replace a task's step list.
+
+        Parameters:
+        task (dict): A task held by this store.
+        steps (list): The new list of step dicts.
+        """
+        task["steps"] = steps
+        _ensure_ids(task)
+        self._index_steps(task)
+        self._journal([{"op": "steps", "index": self.position(task), "steps": steps}])
+
+    def insert_step(self, task, step, step_index=None):
+        """
+        Insert a single step into a task, appending when step_index is None.
+
+        Only the new step is journaled, so adding steps one at a time stays cheap.
+
+        Parameters:
+        task (dict): A task held by this store.
+        step (dict): The step to insert.
+        step_index (int or None): Position within the task's steps.
+        """
+        if not step.get("id"):
+            step["id"] = new_id()
+        steps = task.setdefault("steps", [])
+        if step_index is None or not 0 <= step_index <= len(steps):
+            step_index = len(steps)
+        steps.insert(step_index, step)
+        self._index_steps(task)
+        self._journal([{"op": "insert_step", "index": self.position(task), "at": step_index, "step": step}])
+
+    def update_step(self, task, step_index, fields):
+        """
+        Update fields of a single step in place.
+
+        Parameters:
+        task (dict): A task held by this store.
+        step_index (int): Index of the step within the task.
+        fields (dict): Field values to set on the step.
+        """
+        task["steps"][step_index].update(fields)
+        if "description" in fields:
+            self._index_steps(task)
+        self._journal([{
+            "op": "step",
+            "index": self.position(task),
+            "step": step_index,
+            "fields": fields,
+        }])
+
+
+def _ensure_ids(task):
+    """
+    Assign IDs to a task and its steps where they are missing.
+
+    Parameters:
+    task (dict): The task to update in place.
+
+    Returns:
+    bool: True if any ID was added.
+    """
+    changed = False
+    if not task.get("id"):
+        task["id"] = new_id()
+        changed = True
+    for step in task.get("steps", []):
+        if not step.get("id"):
+            step["id"] = new_id()
+            changed = True
+    return changed
@@ -1,6 +1,11 @@
-from .LLM_API import gpt_api_call
+from .LLM_API import gpt_api_call, gpt_api_calls, gpt_api_stream, StreamError, is_error_response, is_connection_error, has_cached_response, discard_cached_response, replace_cached_response
+from .JsonStream import JsonEventParser
+from .Responses import parse_response, repair_request, record
+from .Prompts import compact_json, task_prompt
+from .TaskStore import get_store
+from .Storage import get_backend, project_name
+from .Graph import notify_activity
 import json
-import re 
 import os
 from datetime import datetime
 import sys
@@ -17,7 +22,6 @@ else:
 
 # Uses the base directory to create the necessary file paths
 TASKS_FILE = os.path.join(BASE_DIR, "..", "data", "Prism_Task_Data.json")
-ACTIVITY_FILE = os.path.join(BASE_DIR, "..", "data", "Task_Activity_Log.json")
 
 def set_tasks_file(new_path):
     """
@@ -27,38 +31,402 @@ def set_tasks_file(new_path):
     TASKS_FILE = new_path
 
 
-def create_task(usr_inp):
+def _resolve_task(store, usr):
     """
-    Creates a structured task from user input using the GPT API and saves it to file.
+    Find the task addressed by a request, preferring its persistent ID.
+
+    Parameters:
+    store (TaskStore): The active project's store.
+    usr (dict): Request with 'task_id', or 'title' and 'description'.
+
+    Returns:
+    dict or None: The matching task.
+    """
+    if usr.get("task_id"):
+        return store.get(usr["task_id"])
+    return store.find(usr.get("title"), usr.get("description"))
+
+
+def _resolve_step(store, usr, step_key):
+    """
+    Find the task and step addressed by a request, preferring the step's persistent ID.
+
+    Parameters:
+    store (TaskStore): The active project's store.
+    usr (dict): Request with 'step_id', or the task keys plus the step description under step_key.
+    step_key (str): Key holding the step description, e.g. 'step_to_expand'.
+
+    Returns:
+    tuple: (task, step index), or (task or None, -1) if the step was not found.
+    """
+    if usr.get("step_id"):
+        return store.find_step(usr["step_id"])
+    task = _resolve_task(store, usr)
+    if task is None:
+        return None, -1
+    return task, store.step_index(task, usr.get(step_key))
+
+
+CREATE_TASK_RULE = (
+    "The default response for tasks should be formatted as a JSON file with the following structure: "
+    "- **Title**: Task title. "
+    "- **Description**: A description without phrases like 'The process includes.' "
+    "- **Steps**: A numbered list of steps without sub-numbering, each under 100 characters. "
+    "- **Estimated Total Time**: A time estimate for completion."
+)
+
+EXPAND_STEP_RULE = (
+    "When given a JSON input containing 'title', 'description', and 'step_to_expand', break the specified step into detailed actions."
+    "Return a JSON with the structure: 'Steps' as a list of objects, each containing a 'Description' of a detailed action or sub-step."
+    "Each step should be under a 100 characters. Do not include titles or additional descriptions."
+)
+
+COMBINE_STEPS_RULE = (
+    "When given a JSON input containing 'title', 'description', and 'steps_to_combine', merge the listed steps into a single, concise step that maintains the essence of all included actions."
+    "Return a JSON with the structure where 'Step' contains a single, cohesive step combining all provided steps, and under a 100 characters. Do not include titles or additional descriptions beyond the combined step."
+)
+
+ADD_STEP_RULE = (
+    "When given a JSON input containing 'title', 'description', and 'steps_to_add' rewrite the step so that it clearly and concisely supports the completion of the task described. "
+    "Return it in a json object called 'step' which is under a 100 characters"
+)
+
+ADD_CONTEXT_RULE = (
+    "When modifying or updating the task breakdown, always respond with a JSON object "
+    "that includes the updated title, description, steps, and estimated total time. "
+    "Each step should be under 100 characters. The JSON must accurately reflect any context changes provided by the user."
+)
+
+# Description of a task shown while its create_task response is outstanding
+PLACEHOLDER_DESCRIPTION = "Waiting for a response…"
+
+
+def request_completion(request):
+    """
+    Send a prepared LLM request and return its parsed response.
+
+    This is the only part of an LLM-backed operation that does not touch the task
+    store, so it is safe to run on a worker thread. Every operation is split into
+    prepare_<operation>(...) -> request, request_completion(request) and
+    apply_<operation>(request, result); the plain <operation>(...) functions run
+    all three in a row.
+
+    Responses are validated against the operation's schema (see Responses.py), and
+    an unusable response gets at most one repair request. Batch requests (with a
+    'requests' list) send their sub-requests concurrently.
+
+    Parameters:
+    request (dict): Request from one of the prepare_* functions.
+
+    Returns:
+    dict or list: Parse result with 'data' (None if unusable), 'error' and
+        'retries'; a list of them, in order, for batch requests.
+    """
+    if "requests" in request:
+        requests = request["requests"]
+        responses = gpt_api_calls([(sub["input"], sub["rule"]) for sub in requests])
+        return _check_responses(requests, responses)
+    return _check_responses([request], [gpt_api_call(request["input"], request["rule"])])[0]
+
+
+def needs_retry(result):
+    """
+    Return True if a request_completion result failed because the API could not be reached.
+
+    Such requests are worth sending again later; any other failure is final.
+    """
+    results = result if isinstance(result, list) else [result]
+    return any(sub["data"] is None and is_connection_error(sub["error"]) for sub in results)
+
+
+def _check_responses(requests, responses):
+    """
+    Parse responses against their operations' schemas, repairing failures once.
+
+    Repair requests for several failed responses are sent concurrently. A repaired
+    response replaces the cached original; one that stays unusable is dropped from
+    the cache.
+
+    Parameters:
+    requests (list): Requests from the prepare_* functions.
+    responses (list): Their raw responses, in the same order.
+
+    Returns:
+    list: Parse results, in the same order.
+    """
+    results = [parse_response(sub["operation"], response) for sub, response in zip(requests, responses)]
+
+    to_repair = []
+    for i, (result, response) in enumerate(zip(results, responses)):
+        if result["data"] is None:
+            if is_error_response(response):
+                # The call itself failed; there is nothing to repair
+                result["error"] = response or "The response is empty."
+            else:
+                to_repair.append(i)
+
+    if to_repair:
+        repairs = gpt_api_calls([
+            repair_request(requests[i]["operation"], responses[i], results[i]["error"]) for i in to_repair
+        ])
+        for i, response in zip(to_repair, repairs):
+            result = parse_response(requests[i]["operation"], response)
+            result["retries"] = 1
+            if result["data"] is not None:
+                replace_cached_response(requests[i]["input"], requests[i]["rule"], json.dumps(result["data"]))
+                print(f"Repaired {requests[i]['operation']} response with 1 retry.")
+            results[i] = result
+
+    for sub, result in zip(requests, results):
+        if result["data"] is None:
+            print(f"Error: Unusable {sub['operation']} response: {result['error']}")
+            _discard_response(sub)
+        record(result)
+    return results
+
+
+def stream_completion(request):
+    """
+    Send a prepared LLM request and yield its parsed parts as they stream in.
+
+    Like request_completion, this does not touch the task store and may run on a
+    worker thread. Operations that support streaming have an
+    apply_<operation>_event(request, event) function that takes these events.
+
+    Parameters:
+    request (dict): Request from one of the prepare_* functions.
+
+    Yields:
+    tuple: ("field", key, value) for each completed top-level member,
+        ("item", value) for each completed entry of "Steps", and finally
+        ("done", parse result of the full response, as from request_completion).
+        If the call fails, even after some parts were yielded, the final result
+        holds the error and no data; parts already applied must be undone.
+    """
+    parser = JsonEventParser("Steps")
+    parts = []
+    for chunk in gpt_api_stream(request["input"], request["rule"]):
+        if isinstance(chunk, StreamError):
+            # A broken transfer is not a malformed response; don't send it for repair
+            result = {"data": None, "error": str(chunk) or "The response is empty.", "retries": 0}
+            print(f"Error: Unusable {request['operation']} response: {result['error']}")
+            yield ("done", record(result))
+            return
+        parts.append(chunk)
+        yield from parser.feed(chunk)
+    yield ("done", _check_responses([request], ["".join(parts)])[0])
+
+
+def _step_text(item):
+    """Return the description of a streamed "Steps" entry, a string or a {'Description': ...} object."""
+    if isinstance(item, dict):
+        return item.get("Description", item.get("description", ""))
+    return str(item)
+
+
+def _discard_response(request):
+    """Forget a cached response that could not be used, so a retry asks the API again."""
+    discard_cached_response(request["input"], request["rule"])
+
+
+def prepare_create_task(usr_inp):
+    """
+    Build the LLM request for a new task.
 
     Parameters:
     usr_inp (str): The raw user input describing the task to create.
+
+    Returns:
+    dict: The request.
+    """
+    return {"operation": "create_task", "tasks_file": TASKS_FILE, "input": usr_inp, "rule": CREATE_TASK_RULE}
+
+
+def insert_placeholder_task(request):
+    """
+    Show a create_task request in the Ideas menu before its response arrives.
+
+    The placeholder is titled with the user's text and has no steps; the response
+    fills it in. Its ID is recorded in the request as 'placeholder_id'.
+
+    Parameters:
+    request (dict): Request from prepare_create_task.
+
+    Returns:
+    dict or None: The placeholder, or None if the same text is already waiting for a response.
+    """
+    store = get_store(request["tasks_file"])
+    title = request["input"].strip()
+    if _duplicate_task(store, title, PLACEHOLDER_DESCRIPTION, "idea") is not None:
+        return None
+
+    placeholder = {
+        "title": title,
+        "description": PLACEHOLDER_DESCRIPTION,
+        "priority": 5,
+        "expectedTime": "",
+        "elapsedTime": 0,
+        "category": "idea",
+        "steps": []
+    }
+    store.insert(placeholder)
+    request["placeholder_id"] = placeholder["id"]
+    return placeholder
+
+
+def _placeholder(store, request):
+    """Return the request's placeholder task if it is still in the project, else None."""
+    placeholder_id = request.get("placeholder_id")
+    return store.get(placeholder_id) if placeholder_id else None
+
+
+def apply_create_task(request, result):
+    """
+    Save the task described by a create_task response under the "idea" category.
+
+    A placeholder inserted for the request is filled in with the response. If the
+    response is unusable, the placeholder is kept as a plain task holding the
+    user's text.
+
+    Parameters:
+    request (dict): Request from prepare_create_task.
+    result (dict): Parse result from request_completion.
+
+    Returns:
+    bool: True if the task was saved.
+    """
+    store = get_store(request["tasks_file"])
+    placeholder = _placeholder(store, request)
+    data = result["data"]
+
+    if data is None:
+        if placeholder is not None and placeholder["description"] == PLACEHOLDER_DESCRIPTION:
+            store.update_task(placeholder, {"description": ""})
+        return False
+
+    if placeholder is None:
+        # Save task to file with default category "idea"
+        save_task_to_file_with_category(data, tasks_file=request["tasks_file"])
+        return True
+
+    existing = _duplicate_task(store, data["Title"], data["Description"], "idea")
+    if existing is not None:
+        print(f"Task '{data['Title']}' already saved to {request['tasks_file']}")
+        if existing is not placeholder:
+            store.remove(placeholder)
+        return True
+
+    store.set_steps(placeholder, [{"description": step, "duration": 0} for step in data["Steps"]])
+    store.update_task(placeholder, {
+        "title": data["Title"],
+        "description": data["Description"],
+        "expectedTime": data["Estimated Total Time"],
+    })
+    print(f"✅ Task saved to {request['tasks_file']}")
+    return True
+
+
+def apply_create_task_event(request, event):
+    """
+    Apply one streamed part of a create_task response.
+
+    The task is inserted as soon as its first step arrives and each further step
+    is appended as it completes; fields that arrive after the steps are filled in
+    at the end. When the request has a placeholder, the steps go into it instead.
+    A response for a task that is already saved (the same input submitted twice)
+    is ignored.
+
+    At the end, the streamed steps are replaced with the validated ones if they
+    differ. If the call failed, the streamed steps are taken out again; a request
+    that will be retried keeps its placeholder waiting.
+
+    Parameters:
+    request (dict): Request from prepare_create_task.
+    event (tuple): Event from stream_completion.
+
+    Returns:
+    bool: False if the operation failed.
     """
-    rule = (
-        "The default response for tasks should be formatted as a JSON file with the following structure: "
-        "- **Title**: Task title. "
-        "- **Description**: A description without phrases like 'The process includes.' "
-        "- **Steps**: A numbered list of steps without sub-numbering, each under 100 characters. "
-        "- **Estimated Total Time**: A time estimate for completion."
-    )
-    
-    # Call GPT API with user input and rule
-    task_breakdown = gpt_api_call(usr_inp, rule)
-    print(task_breakdown)
-
-    # Extract JSON from string if necessary
-    if isinstance(task_breakdown, str):
-        match = re.search(r'\{.*\}', task_breakdown, re.DOTALL)
-        if match:
-            json_output = match.group(0)
-            parsed_json = json.loads(json_output)
+    state = request.setdefault("state", {"fields": {}, "task_id": request.get("placeholder_id")})
+    if state.get("duplicate"):
+        return True
+    store = get_store(request["tasks_file"])
+    task = store.get(state["task_id"]) if state["task_id"] else None
+    kind = event[0]
+
+    if kind == "field":
+        state["fields"][event[1]] = event[2]
+        return True
+
+    if kind == "item":
+        step = {"description": _step_text(event[1]), "duration": 0}
+        if task is None or not task["steps"]:
+            fields = state["fields"]
+            if _duplicate_task(store, fields.get("Title", ""), fields.get("Description", ""), "idea") is not None:
+                if task is not None:
+                    store.remove(task)
+                state["duplicate"] = True
+                return True
+        if task is None:
+            fields = state["fields"]
+            new_task = {
+                "title": fields.get("Title", ""),
+                "description": fields.get("Description", ""),
+                "priority": 5,
+                "expectedTime": fields.get("Estimated Total Time", ""),
+                "elapsedTime": 0,
+                "category": "idea",
+                "steps": [step]
+            }
+            store.insert(new_task)
+            state["task_id"] = new_task["id"]
         else:
-            raise ValueError("No valid JSON found in the GPT response.")
-    else:
-        parsed_json = task_breakdown
+            store.insert_step(task, step)
+        return True
+
+    result = event[1]
+    if result["data"] is None and task is not None and task["steps"]:
+        # The call failed part way; take back what was streamed
+        if task["id"] == request.get("placeholder_id"):
+            store.set_steps(task, [])
+        else:
+            store.remove(task)
+            state["task_id"] = task = None
+    if result["data"] is None and needs_retry(result):
+        return False
+
+    # Nothing streamed means the response was not usable incrementally
+    if task is None or not task["steps"]:
+        return apply_create_task(request, result)
+
+    # Prefer the validated fields and steps over the streamed ones
+    fields = result["data"]
+    steps = [step["description"] for step in task["steps"]]
+    if fields["Steps"] != steps:
+        store.set_steps(task, [{"description": step, "duration": 0} for step in fields["Steps"]])
+    updates = {
+        name: fields[key]
+        for key, name in (("Title", "title"), ("Description", "description"), ("Estimated Total Time", "expectedTime"))
+        if key in fields and task.get(name) != fields[key]
+    }
+    if task["description"] == PLACEHOLDER_DESCRIPTION and "description" not in updates:
+        updates["description"] = ""
+    if updates:
+        store.update_task(task, updates)
 
-    # Save task to file with default category "idea"
-    save_task_to_file_with_category(parsed_json)
+    print(f"✅ Task saved to {request['tasks_file']}")
+    return True
+
+
+def create_task(usr_inp):
+    """
+    Creates a structured task from user input using the GPT API and saves it to file.
+
+    Parameters:
+    usr_inp (str): The raw user input describing the task to create.
+    """
+    request = prepare_create_task(usr_inp)
+    apply_create_task(request, request_completion(request))
 
 
 def move_task(tasks, fromIndex, toIndex, category):
@@ -79,19 +447,9 @@ def move_task(tasks, fromIndex, toIndex, category):
     # Swap the tasks in-place
     tasks[fromIndex], tasks[toIndex] = tasks[toIndex], tasks[fromIndex]
 
-    # Load all tasks from file
-    with open(TASKS_FILE, "r", encoding="utf-8") as f:
-        all_tasks = json.load(f)
-
-    # Filter out tasks belonging to the current category
-    other_tasks = [t for t in all_tasks if t.get("category") != category]
-
-    # Combine untouched tasks with the updated category-specific task list
-    combined = other_tasks + tasks
-
-    # Persist the combined task list back to the JSON file
-    with open(TASKS_FILE, "w", encoding="utf-8") as f:
-        json.dump(combined, f, indent=4)
+    # Swap the same two tasks in the project store
+    if not get_store(TASKS_FILE).swap_in_category(category, fromIndex, toIndex):
+        print(f"Invalid move: category '{category}' is out of sync with {TASKS_FILE}")
 
 
 def move_tasks_category(fromCategory, index, toCategory):
@@ -103,26 +461,8 @@ def move_tasks_category(fromCategory, index, toCategory):
     index (int): The index of the task in the source category to move.
     toCategory (str): The category to move the task to.
     """
-    with open(TASKS_FILE, "r", encoding="utf-8") as f:
-        all_tasks = json.load(f)
-
-    # Separate tasks in source category and others
-    from_tasks = [t for t in all_tasks if t["category"] == fromCategory]
-    other_tasks = [t for t in all_tasks if t["category"] != fromCategory]
-
-    # Safely remove the task at index from the source category tasks
-    if index < 0 or index >= len(from_tasks):
-        raise IndexError(f"Index {index} out of range for category '{fromCategory}' with {len(from_tasks)} tasks")
-
-    task = from_tasks.pop(index)
-    task["category"] = toCategory
-
-    # Reassemble the tasks list: tasks not in source category + updated source category tasks + moved task at the end
-    all_tasks = other_tasks + from_tasks + [task]
-
-    with open(TASKS_FILE, "w", encoding="utf-8") as f:
-        json.dump(all_tasks, f, indent=4)
-
+    # Raises IndexError if index is out of range for the source category
+    get_store(TASKS_FILE).move_to_category(fromCategory, index, toCategory)
 
 
 def move_step(submenu_items, dev_menu_items, selected_index, from_index, to_index):
@@ -149,46 +489,63 @@ def move_step(submenu_items, dev_menu_items, selected_index, from_index, to_inde
     if 0 <= selected_index < len(dev_menu_items):
         dev_menu_items[selected_index]["steps"] = submenu_items
 
-        # Load all tasks and update steps for the matched dev task
-        with open(TASKS_FILE, "r", encoding="utf-8") as f:
-            all_tasks = json.load(f)
-
-        for task in all_tasks:
-            if (
-                task.get("category") == "dev" and
-                task.get("title") == dev_menu_items[selected_index]["title"]
-            ):
-                task["steps"] = submenu_items
-                break
-
-        # Save updated tasks list back to file
-        with open(TASKS_FILE, "w", encoding="utf-8") as f:
-            json.dump(all_tasks, f, indent=4)
+        # Update steps for the matched dev task in the store
+        store = get_store(TASKS_FILE)
+        selected = dev_menu_items[selected_index]
+        task = store.find(selected["title"], selected["description"])
+        if task is not None and task.get("category") == "dev":
+            store.set_steps(task, submenu_items)
     else:
         print("Selected dev menu index is out of bounds.")
 
 
-def save_task_to_file_with_category(task, category="idea", index=None):
+def move_step_by_id(step_id, to_index):
+    """
+    Move a step to a new position within its task.
+
+    Parameters:
+    step_id (str): Persistent ID of the step to move.
+    to_index (int): Target index within the task's steps.
+    """
+    store = get_store(TASKS_FILE)
+    task, from_index = store.find_step(step_id)
+    if task is None:
+        print(f"Step '{step_id}' not found.")
+        return
+
+    steps = list(task["steps"])
+    if not 0 <= to_index < len(steps):
+        print(f"Invalid step move: from {from_index} to {to_index}")
+        return
+
+    steps.insert(to_index, steps.pop(from_index))
+    store.set_steps(task, steps)
+
+
+def save_task_to_file_with_category(task, category="idea", index=None, tasks_file=None):
     """
     Save a new task to the tasks JSON file under the specified category.
     If an index is provided, insert the task at that position; otherwise, append it.
 
+    Saving is idempotent: if the category already holds a task with the same title
+    and description (e.g. the same input was submitted twice), nothing is added.
+
     Parameters:
     task (dict): Task data with keys 'Title', 'Description', 'Steps', and 'Estimated Total Time'.
     category (str): Category to assign to the new task. Defaults to "idea".
     index (int or None): Optional position to insert the task. Appends if None or invalid.
+    tasks_file (str or None): Project file to save to; the active TASKS_FILE if None.
+
+    Returns:
+    dict: The saved task, or the existing one it duplicates.
     """
-    # Load existing tasks or initialize an empty list if file missing or invalid
-    if os.path.exists(TASKS_FILE):
-        with open(TASKS_FILE, "r", encoding="utf-8") as file:
-            try:
-                tasks = json.load(file)
-                if not isinstance(tasks, list):
-                    tasks = []
-            except json.JSONDecodeError:
-                tasks = []
-    else:
-        tasks = []
+    tasks_file = tasks_file or TASKS_FILE
+    store = get_store(tasks_file)
+
+    existing = _duplicate_task(store, task["Title"], task["Description"], category)
+    if existing is not None:
+        print(f"Task '{existing['title']}' already saved to {tasks_file}")
+        return existing
 
     # Format steps to include description and default duration
     formatted_steps = [{"description": step, "duration": 0} for step in task["Steps"]]
@@ -204,16 +561,177 @@ def save_task_to_file_with_category(task, category="idea", index=None):
     }
 
     # Insert at index or append to the task list
-    if index is not None and 0 <= index <= len(tasks):
-        tasks.insert(index, new_task)
+    store.insert(new_task, index)
+
+    print(f"✅ Task saved to {tasks_file}")
+    return new_task
+
+
+def _duplicate_task(store, title, description, category):
+    """Return the task of a category with the given title and description, or None."""
+    existing = store.find(title, description)
+    if existing is not None and existing.get("category") == category:
+        return existing
+    return None
+
+
+def prepare_expand_step(usr_stp):
+    """
+    Build the LLM request for expanding a step into sub-steps.
+
+    Parameters:
+    usr_stp (dict): Contains 'title', 'description', and 'step_to_expand' keys, or a 'step_id',
+                    to identify the task and the step to expand.
+
+    Returns:
+    dict or None: The request, or None if the step was not found.
+    """
+    # Find the matching task and step index
+    store = get_store(TASKS_FILE)
+    task, found_index = _resolve_step(store, usr_stp, 'step_to_expand')
+    if found_index == -1:
+        print("Step to expand not found.")
+        return None
+
+    step_data = {
+        'title': task['title'],
+        'description': task['description'],
+        'step_to_expand': task['steps'][found_index]['description']
+    }
+    return {
+        "operation": "expand_step",
+        "tasks_file": TASKS_FILE,
+        "input": step_data,
+        "rule": EXPAND_STEP_RULE,
+        "step_id": task['steps'][found_index]['id'],
+    }
+
+
+def _expanded_steps(result):
+    """
+    Return the new step dicts of an expand_step parse result, or None if it is unusable.
+
+    Parameters:
+    result (dict): Parse result from request_completion.
+    """
+    if result["data"] is None:
+        return None
+    return [{"description": description, "duration": 0} for description in result["data"]["Steps"]]
+
+
+def apply_expand_step(request, result):
+    """
+    Replace the expanded step with the sub-steps from the LLM response.
+
+    Parameters:
+    request (dict): Request from prepare_expand_step.
+    result (dict): Parse result from request_completion.
+
+    Returns:
+    bool: True if the task was updated.
+    """
+    formatted_steps = _expanded_steps(result)
+    if formatted_steps is None:
+        return False
+
+    # The step may have moved or been deleted while the request was running
+    store = get_store(request["tasks_file"])
+    task, found_index = store.find_step(request["step_id"])
+    if task is None:
+        print("Step to expand no longer exists.")
+        return False
+
+    # Replace original step with expanded sub-steps
+    steps = list(task['steps'])
+    steps[found_index:found_index + 1] = formatted_steps
+
+    store.set_steps(task, steps)
+
+    print(f"JSON file updated successfully at {request['tasks_file']}")
+    return True
+
+
+def apply_expand_step_event(request, event):
+    """
+    Apply one streamed part of an expand_step response.
+
+    The first sub-step replaces the expanded step and each further sub-step is
+    inserted after the previous one as it completes. At the end, the streamed
+    sub-steps are replaced with the validated ones if they differ, or with the
+    original step again if the call failed.
+
+    Parameters:
+    request (dict): Request from prepare_expand_step.
+    event (tuple): Event from stream_completion.
+
+    Returns:
+    bool: False if the operation failed.
+    """
+    state = request.setdefault("state", {"inserted": []})
+    kind = event[0]
+
+    if kind == "field":
+        return True
+
+    if kind == "done":
+        # Nothing streamed means the response was not usable incrementally
+        if not state["inserted"]:
+            return apply_expand_step(request, event[1])
+
+        formatted_steps = _expanded_steps(event[1])
+        if formatted_steps is None:
+            _replace_streamed_steps(get_store(request["tasks_file"]), state, [state["original"]])
+            return False
+        descriptions = [step["description"] for step in formatted_steps]
+        if descriptions != state["descriptions"]:
+            _replace_streamed_steps(get_store(request["tasks_file"]), state, formatted_steps)
+        print(f"JSON file updated successfully at {request['tasks_file']}")
+        return True
+
+    store = get_store(request["tasks_file"])
+    step = {"description": _step_text(event[1]), "duration": 0}
+    if state["inserted"]:
+        task, index = store.find_step(state["inserted"][-1])
+        index += 1
+        replace = 0
+    else:
+        task, index = store.find_step(request["step_id"])
+        replace = 1
+    if task is None:
+        print("Step to expand no longer exists.")
+        return False
+
+    if replace:
+        # The first sub-step takes the expanded step's place
+        steps = list(task["steps"])
+        state["original"] = dict(steps[index])
+        state["descriptions"] = []
+        steps[index] = step
+        store.set_steps(task, steps)
     else:
-        tasks.append(new_task)
+        store.insert_step(task, step, index)
+    state["inserted"].append(step["id"])
+    state["descriptions"].append(step["description"])
+    return True
 
-    # Save updated tasks list back to file
-    with open(TASKS_FILE, "w", encoding="utf-8") as file:
-        json.dump(tasks, file, indent=4, ensure_ascii=False)
 
-    print(f"✅ Task saved to {TASKS_FILE}")
+def _replace_streamed_steps(store, state, new_steps):
+    """
+    Put new steps where the streamed sub-steps of an expand_step request were inserted.
+
+    Parameters:
+    store (TaskStore): The project's store.
+    state (dict): The request's streaming state.
+    new_steps (list): Step dicts to put in their place.
+    """
+    task, index = store.find_step(state["inserted"][0])
+    if task is None:
+        return
+    inserted = set(state["inserted"])
+    steps = [step for step in task["steps"] if step["id"] not in inserted]
+    steps[index:index] = new_steps
+    store.set_steps(task, steps)
+    state["inserted"] = [step["id"] for step in new_steps if "id" in step]
 
 
 def expand_step(usr_stp):
@@ -222,202 +740,336 @@ def expand_step(usr_stp):
     Update the task JSON file by replacing the original step with the new sub-steps.
 
     Parameters:
-    usr_stp (dict): Contains 'title', 'description', and 'step_to_expand' keys to identify
-                    the task and the step to expand.
+    usr_stp (dict): Contains 'title', 'description', and 'step_to_expand' keys, or a 'step_id',
+                    to identify the task and the step to expand.
     """
-    rule = (
-        "When given a JSON input containing 'title', 'description', and 'step_to_expand', break the specified step into detailed actions."
-        "Return a JSON with the structure: 'Steps' as a list of objects, each containing a 'Description' of a detailed action or sub-step."
-        "Each step should be under a 100 characters. Do not include titles or additional descriptions."
-    )
-    expanded_steps_str = gpt_api_call(usr_stp, rule)
+    request = prepare_expand_step(usr_stp)
+    if request is not None:
+        apply_expand_step(request, request_completion(request))
 
-    try:
-        expanded_steps = json.loads(expanded_steps_str)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON from gpt_api_call: {e}")
-        print(f"Raw response: {expanded_steps_str}")
-        return
 
-    try:
-        with open(TASKS_FILE, 'r') as file:
-            json_data = json.load(file)
-    except FileNotFoundError:
-        print(f"Error: File not found at {TASKS_FILE}")
-        return
-    except json.JSONDecodeError:
-        print(f"Error: Invalid JSON format in {TASKS_FILE}")
-        return
+def prepare_prefetch_expansions(task_id, limit=None):
+    """
+    Build expand_step requests for the steps of a task whose expansions are not cached yet.
+
+    Sending these through request_completion fills the response cache without
+    changing the task, so expanding one of the steps later is answered at once.
+
+    Parameters:
+    task_id (str): Persistent ID of the task.
+    limit (int or None): Only consider the first `limit` steps.
+
+    Returns:
+    list: The requests, in step order.
+    """
+    store = get_store(TASKS_FILE)
+    task = store.get(task_id)
+    if task is None:
+        return []
 
-    found_main_index = -1
-    found_index = -1
-
-    # Find the matching task and step indices
-    for main_index, item in enumerate(json_data):
-        if isinstance(item, dict) and 'title' in item and 'description' in item:
-            if item['title'] == usr_stp['title'] and item['description'] == usr_stp['description']:
-                found_main_index = main_index
-                for index, step in enumerate(item['steps']):
-                    if step['description'] == usr_stp['step_to_expand']:
-                        found_index = index
-                        break
-                break
-
-    if (
-        expanded_steps and
-        'Steps' in expanded_steps and
-        isinstance(expanded_steps['Steps'], list) and
-        expanded_steps['Steps']
-    ):
-        formatted_steps = [{"description": step['Description'], "duration": 0} for step in expanded_steps['Steps']]
-
-        # Replace original step with expanded sub-steps
-        if found_index != -1 and found_main_index != -1:
-            json_data[found_main_index]['steps'][found_index + 1:found_index + 1] = formatted_steps
-            del json_data[found_main_index]['steps'][found_index]
-
-            with open(TASKS_FILE, 'w') as f:
-                json.dump(json_data, f, indent=4)
-
-            print(f"JSON file updated successfully at {TASKS_FILE}")
+    requests = []
+    for step in task["steps"][:limit]:
+        request = prepare_expand_step({"step_id": step["id"]})
+        if request is not None and not has_cached_response(request["input"], request["rule"]):
+            requests.append(request)
+    return requests
+
+
+def prepare_expand_steps(task_id, step_ids):
+    """
+    Build one batch request expanding several steps of a task.
+
+    Parameters:
+    task_id (str): Persistent ID of the task.
+    step_ids (list of str): Persistent IDs of the steps to expand.
+
+    Returns:
+    dict or None: The batch request, or None if none of the steps were found.
+    """
+    store = get_store(TASKS_FILE)
+    task = store.get(task_id)
+    requests = []
+    for step_id in step_ids:
+        owner, _ = store.find_step(step_id)
+        if task is not None and owner is task:
+            requests.append(prepare_expand_step({"step_id": step_id}))
+
+    if not requests:
+        print("Error: Could not find the steps to expand.")
+        return None
+
+    return {
+        "operation": "expand_steps",
+        "tasks_file": TASKS_FILE,
+        "task_id": task_id,
+        "requests": requests,
+    }
+
+
+def apply_expand_steps(request, results):
+    """
+    Replace every expanded step with its sub-steps in a single store update.
+
+    Steps whose response is unusable are left as they are.
+
+    Parameters:
+    request (dict): Request from prepare_expand_steps.
+    results (list): Parse results, in the order of request['requests'].
+
+    Returns:
+    bool: True if at least one step was expanded.
+    """
+    expansions = {}
+    for sub_request, result in zip(request["requests"], results):
+        formatted_steps = _expanded_steps(result)
+        if formatted_steps is not None:
+            expansions[sub_request["step_id"]] = formatted_steps
+
+    store = get_store(request["tasks_file"])
+    task = store.get(request["task_id"])
+    if task is None:
+        print("Task to expand no longer exists.")
+        return False
+
+    steps = []
+    expanded = 0
+    for step in task['steps']:
+        if step['id'] in expansions:
+            steps.extend(expansions[step['id']])
+            expanded += 1
         else:
-            print("Step to expand not found.")
-    else:
-        print("Error: expanded_steps does not contain the expected structure.")
+            steps.append(step)
 
+    if not expanded:
+        print("Error: None of the steps could be expanded.")
+        return False
 
-def combine_steps(usr_stps):
+    store.set_steps(task, steps)
+
+    print(f"Expanded {expanded} of {len(request['requests'])} steps at {request['tasks_file']}")
+    return True
+
+
+def expand_steps(task_id, step_ids):
     """
-    Combines multiple user-defined steps into a single concise step in a JSON task file.
+    Expand several steps of a task at once.
+
+    The LLM requests are sent concurrently and all results are applied to the
+    task in a single write.
 
     Parameters:
-    usr_stps (dict): A dictionary with 'title', 'description', and 'steps_to_combine'.
+    task_id (str): Persistent ID of the task.
+    step_ids (list of str): Persistent IDs of the steps to expand.
     """
-    rule = (
-        "When given a JSON input containing 'title', 'description', and 'steps_to_combine', merge the listed steps into a single, concise step that maintains the essence of all included actions."
-        "Return a JSON with the structure where 'Step' contains a single, cohesive step combining all provided steps, and under a 100 characters. Do not include titles or additional descriptions beyond the combined step."
-    )
+    request = prepare_expand_steps(task_id, step_ids)
+    if request is not None:
+        apply_expand_steps(request, request_completion(request))
 
-    combined_step_str = gpt_api_call(usr_stps, rule)
 
-    try:
-        combined_step = json.loads(combined_step_str)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON from gpt_api_call: {e}")
-        print(f"Raw response: {combined_step_str}")
-        return
+def prepare_combine_steps(usr_stps):
+    """
+    Build the LLM request for merging several steps into one.
 
-    try:
-        with open(TASKS_FILE, 'r') as file:
-            json_data = json.load(file)
-    except FileNotFoundError:
-        print(f"Error: File not found at {TASKS_FILE}")
-        return
-    except json.JSONDecodeError:
-        print(f"Error: Invalid JSON format in {TASKS_FILE}")
-        return
+    Parameters:
+    usr_stps (dict): A dictionary with 'title', 'description', and 'steps_to_combine',
+                     or with 'task_id' and 'step_ids'.
 
-    found_main_index = None
+    Returns:
+    dict or None: The request, or None if no steps to combine were found.
+    """
+    # Locate the main task and the indices of the steps to combine
+    store = get_store(TASKS_FILE)
+    task = _resolve_task(store, usr_stps)
     found_indices = []
+    if task is not None and usr_stps.get('step_ids'):
+        for step_id in usr_stps['step_ids']:
+            owner, index = store.find_step(step_id)
+            if owner is task:
+                found_indices.append(index)
+    elif task is not None:
+        to_combine = set(usr_stps['steps_to_combine'])
+        found_indices = [index for index, step in enumerate(task['steps']) if step['description'] in to_combine]
+
+    if not found_indices:
+        print("Error: Could not find the steps to replace.")
+        return None
 
-    # Locate the main task by matching title and description
-    for main_index, item in enumerate(json_data):
-        if isinstance(item, dict) and 'title' in item and 'description' in item:
-            if item['title'] == usr_stps['title'] and item['description'] == usr_stps['description']:
-                found_main_index = main_index
+    found_indices = sorted(found_indices)
+    steps_data = {
+        'title': task['title'],
+        'description': task['description'],
+        'steps_to_combine': [task['steps'][index]['description'] for index in found_indices]
+    }
+    return {
+        "operation": "combine_steps",
+        "tasks_file": TASKS_FILE,
+        "input": steps_data,
+        "rule": COMBINE_STEPS_RULE,
+        "task_id": task['id'],
+        "step_ids": [task['steps'][index]['id'] for index in found_indices],
+    }
 
-                # Identify indices of steps to combine
-                for index, step in enumerate(item['steps']):
-                    if step['description'] in usr_stps['steps_to_combine']:
-                        found_indices.append(index)
 
-                break  # Exit after finding the correct task
+def apply_combine_steps(request, result):
+    """
+    Replace the combined steps with the single step from the LLM response.
 
-    if found_main_index is not None and found_indices:
-        # Remove steps in reverse order to avoid index shifting
-        found_indices.sort(reverse=True)
-        for index in found_indices:
-            del json_data[found_main_index]['steps'][index]
+    Parameters:
+    request (dict): Request from prepare_combine_steps.
+    result (dict): Parse result from request_completion.
 
-        # Insert the new combined step at the earliest removed step's position
-        formatted_combined_step = {"description": combined_step['Step'], "duration": 0}
-        insertion_index = min(found_indices)
-        json_data[found_main_index]['steps'].insert(insertion_index, formatted_combined_step)
+    Returns:
+    bool: True if the task was updated.
+    """
+    combined_step = result["data"]
+    if combined_step is None:
+        return False
 
-        # Write updated data back to the JSON file
-        with open(TASKS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=4)
+    # Steps deleted while the request was running are simply not removed again
+    store = get_store(request["tasks_file"])
+    task = store.get(request["task_id"])
+    found_indices = []
+    for step_id in request["step_ids"]:
+        owner, index = store.find_step(step_id)
+        if task is not None and owner is task:
+            found_indices.append(index)
 
-        print(f"Updated JSON file at {TASKS_FILE}")
-    else:
+    if not found_indices:
         print("Error: Could not find the steps to replace.")
+        return False
+
+    # Drop the combined steps and insert the new step at the earliest removed position
+    removed = set(found_indices)
+    steps = [step for index, step in enumerate(task['steps']) if index not in removed]
+    formatted_combined_step = {"description": combined_step['Step'], "duration": 0}
+    steps.insert(min(found_indices), formatted_combined_step)
+
+    store.set_steps(task, steps)
 
+    print(f"Updated JSON file at {request['tasks_file']}")
+    return True
 
-def add_step(usr_inp, task_index):
+
+def combine_steps(usr_stps):
     """
-    Adds a new step to a development task based on user input.
+    Combines multiple user-defined steps into a single concise step in a JSON task file.
 
     Parameters:
-    usr_inp (str): The raw step text to be refined and added.
-    task_index (int): Index of the dev task in the filtered list of development tasks.
+    usr_stps (dict): A dictionary with 'title', 'description', and 'steps_to_combine',
+                     or with 'task_id' and 'step_ids'.
     """
-    try:
-        with open(TASKS_FILE, 'r', encoding='utf-8') as file:
-            json_data = json.load(file)
-    except FileNotFoundError:
-        print(f"Error: File not found at {TASKS_FILE}")
-        return
+    request = prepare_combine_steps(usr_stps)
+    if request is not None:
+        apply_combine_steps(request, request_completion(request))
 
-    # Filter all development tasks and get their indices in the full list
-    dev_task_indices = [i for i, task in enumerate(json_data) if task.get("category") == "dev"]
 
-    if task_index >= len(dev_task_indices):
-        print(f"Error: task_index {task_index} out of range for dev tasks.")
-        return
+def prepare_add_step(usr_inp, task_index=None, task_id=None):
+    """
+    Build the LLM request for rewriting a new step of a development task.
 
-    full_list_index = dev_task_indices[task_index]
-    dev_task = json_data[full_list_index]
+    Parameters:
+    usr_inp (str): The raw step text to be refined and added.
+    task_index (int): Index of the dev task in the filtered list of development tasks.
+    task_id (str or None): Persistent ID of the task; takes precedence over task_index.
 
-    rule = (
-        "When given a JSON input containing 'title', 'description', and 'steps_to_add' rewrite the step so that it clearly and concisely supports the completion of the task described. "
-        "Return it in a json object called 'step' which is under a 100 characters"
-    )
+    Returns:
+    dict or None: The request, or None if the task was not found.
+    """
+    store = get_store(TASKS_FILE)
+    dev_task = _resolve_dev_task(store, task_index, task_id)
+    if dev_task is None:
+        return None
 
     step_data = {
         'title': dev_task['title'],
         'description': dev_task['description'],
         'step_to_add': usr_inp
     }
+    return {
+        "operation": "add_step",
+        "tasks_file": TASKS_FILE,
+        "input": step_data,
+        "rule": ADD_STEP_RULE,
+        "task_id": dev_task['id'],
+    }
 
-    new_step_breakdown_str = gpt_api_call(step_data, rule)
 
-    if not new_step_breakdown_str:
-        print("Error: The response from gpt_api_call is empty or None.")
-        return
+def apply_add_step(request, result):
+    """
+    Insert the step from the LLM response at the top of the task's steps.
 
-    # Clean up GPT response for safe JSON parsing
-    new_step_breakdown_str = new_step_breakdown_str.strip().replace('`', '')
-    new_step_breakdown_str = re.sub(r'^\s*json\s*', '', new_step_breakdown_str).strip()
+    A step the task already has is not added again, so a request submitted
+    twice (answered once by the API) adds it only once.
 
-    try:
-        new_step_breakdown = json.loads(new_step_breakdown_str)
-    except json.JSONDecodeError as e:
-        print(f"Error: Failed to parse response as JSON. {e}")
-        return
+    Parameters:
+    request (dict): Request from prepare_add_step.
+    result (dict): Parse result from request_completion.
+
+    Returns:
+    bool: True if the task was updated.
+    """
+    new_step_breakdown = result["data"]
+    if new_step_breakdown is None:
+        return False
+
+    store = get_store(request["tasks_file"])
+    dev_task = _resolve_dev_task(store, None, request["task_id"])
+    if dev_task is None:
+        return False
 
     new_step = {
         "description": new_step_breakdown["step"],
         "duration": 0
     }
 
-    # Insert new step at the top of the dev task's steps
-    json_data[full_list_index]["steps"].insert(0, new_step)
+    if store.step_index(dev_task, new_step["description"]) != -1:
+        print(f"Step '{new_step['description']}' already added.")
+        return True
 
-    # Persist updated task list to file
-    with open(TASKS_FILE, "w", encoding="utf-8") as file:
-        json.dump(json_data, file, indent=4, ensure_ascii=False)
+    # Insert new step at the top of the dev task's steps
+    store.set_steps(dev_task, [new_step] + dev_task["steps"])
 
     print("✅ Step added and task updated successfully.")
+    return True
+
+
+def add_step(usr_inp, task_index=None, task_id=None):
+    """
+    Adds a new step to a development task based on user input.
+
+    Parameters:
+    usr_inp (str): The raw step text to be refined and added.
+    task_index (int): Index of the dev task in the filtered list of development tasks.
+    task_id (str or None): Persistent ID of the task; takes precedence over task_index.
+    """
+    request = prepare_add_step(usr_inp, task_index, task_id)
+    if request is not None:
+        apply_add_step(request, request_completion(request))
+
+
+def _resolve_dev_task(store, task_index, task_id):
+    """
+    Find a dev task by persistent ID, or by its index among the dev tasks.
+
+    Parameters:
+    store (TaskStore): The active project's store.
+    task_index (int or None): Index within the dev category.
+    task_id (str or None): Persistent task ID; takes precedence over task_index.
+
+    Returns:
+    dict or None: The dev task, or None after printing why it was not found.
+    """
+    if task_id:
+        task = store.get(task_id)
+        if task is None:
+            print(f"Error: task '{task_id}' not found.")
+        return task
+
+    dev_tasks = store.category("dev")
+    if task_index is None or not 0 <= task_index < len(dev_tasks):
+        print(f"Error: task_index {task_index} out of range for dev tasks.")
+        return None
+    return dev_tasks[task_index]
 
 
 def delete_step(usr_stp):
@@ -425,46 +1077,33 @@ def delete_step(usr_stp):
     Delete a specified step from a task in the tasks JSON file.
 
     Parameters:
-    usr_stp (dict): Contains 'title', 'description', and 'step_to_delete' keys to identify
-                    the task and the step to be deleted.
+    usr_stp (dict): Contains 'title', 'description', and 'step_to_delete' keys, or a 'step_id',
+                    to identify the task and the step to be deleted.
     """
-    # Load existing tasks from file
-    try:
-        with open(TASKS_FILE, 'r', encoding='utf-8') as file:
-            json_data = json.load(file)
-    except FileNotFoundError:
-        print(f"Error: File not found at {TASKS_FILE}")
-        return
-    except json.JSONDecodeError:
-        print("Error: Failed to parse JSON data.")
-        return
+    # Find the matching task and check that it has the specified step
+    store = get_store(TASKS_FILE)
+    menu, step_index = _resolve_step(store, usr_stp, "step_to_delete")
+    step_deleted = step_index != -1
 
-    step_deleted = False
-
-    # Find the matching task and remove the specified step
-    for menu in json_data:
-        if menu["title"] == usr_stp['title'] and menu["description"] == usr_stp['description']:
-            original_count = len(menu.get("steps", []))
-            menu["steps"] = [
+    if step_deleted:
+        if usr_stp.get("step_id"):
+            # Remove exactly the addressed step
+            remaining = menu["steps"][:step_index] + menu["steps"][step_index + 1:]
+        else:
+            # Remove every step with that description
+            remaining = [
                 step for step in menu.get("steps", [])
                 if step["description"] != usr_stp["step_to_delete"]
             ]
-            if len(menu["steps"]) < original_count:
-                step_deleted = True
-                break
-
-    if step_deleted:
-        # Save updated tasks back to file
         try:
-            with open(TASKS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, indent=4, ensure_ascii=False)
+            store.set_steps(menu, remaining)
             print("Step deleted and file updated successfully.")
             # If this is inside a class, emit the signal like:
             # self.menuItemsChanged.emit()
         except Exception as e:
             print(f"Error writing to file: {e}")
     else:
-        print(f"Step '{usr_stp['step_to_delete']}' not found in task '{usr_stp['title']}' - '{usr_stp['description']}'")
+        print(f"Step '{usr_stp.get('step_to_delete', usr_stp.get('step_id'))}' not found in task '{usr_stp.get('title')}' - '{usr_stp.get('description')}'")
 
 
 def log_time(usr_time):
@@ -472,157 +1111,129 @@ def log_time(usr_time):
     Update the duration of a specified step in a task and log the activity.
 
     Parameters:
-    usr_time (dict): Contains keys 'title', 'description', 'step_to_record', and 'duration' (in seconds).
+    usr_time (dict): Contains keys 'project', 'duration' (in seconds) and either 'step_id' or
+                     'title', 'description' and 'step_to_record'.
     """
-    # Load tasks data from file
-    try:
-        with open(TASKS_FILE, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-    except FileNotFoundError:
-        print(f"Error: File not found at {TASKS_FILE}")
-        return
-    except json.JSONDecodeError:
-        print("Error: Could not decode JSON.")
-        return
-
-    updated = False
-
     # Find task and step to update duration
-    for task in data:
-        if task["title"] == usr_time["title"] and task["description"] == usr_time["description"]:
-            for step in task["steps"]:
-                if step["description"] == usr_time["step_to_record"]:
-                    print(f"Updating step duration: {step['description']} -> {usr_time['duration']}")
-                    step["duration"] = int(step.get("duration", 0)) + int(usr_time["duration"])
-                    updated = True
-                    break  
-            break  
-
-    # Save updated tasks back to file if a step was updated
-    if updated:
+    store = get_store(TASKS_FILE)
+    task, step_index = _resolve_step(store, usr_time, "step_to_record")
+
+    # Record the new duration if the step was found
+    if step_index != -1:
+        step = task["steps"][step_index]
+        usr_time = dict(usr_time, title=task["title"], step_to_record=step["description"])
+        print(f"Updating step duration: {step['description']} -> {usr_time['duration']}")
         try:
-            with open(TASKS_FILE, 'w', encoding='utf-8') as file:
-                json.dump(data, file, indent=4, ensure_ascii=False)
+            store.update_step(task, step_index, {"duration": int(step.get("duration", 0)) + int(usr_time["duration"])})
             print("Duration updated and file saved.")
         except Exception as e:
             print(f"Error writing updated data: {e}")
+    elif usr_time.get("step_id"):
+        print(f"Step ID '{usr_time['step_id']}' not found; nothing was updated.")
+        # Without the title and step text there is nothing to attribute the activity to
+        if "title" not in usr_time or "step_to_record" not in usr_time:
+            print("Error: Activity not logged; the request has no title or step to record.")
+            return
     else:
         print("Matching step not found; nothing was updated.")
 
     # Log the activity separately
     try:
-        # Load existing activity log or initialize an empty list
-        try:
-            with open(ACTIVITY_FILE, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-        except FileNotFoundError:
-            print(f"Activity file not found at {ACTIVITY_FILE}. Creating a new one.")
-            data = []
-        except json.JSONDecodeError:
-            print("Error: Could not decode JSON in activity log.")
-            data = []
-
         # Convert duration in seconds to H:M:S format
         hours, remainder = divmod(int(usr_time["duration"]), 3600)
         mins, secs = divmod(remainder, 60)
 
-        match = re.search(r'([^\\/]+)_Task_Data\.json$', usr_time["project"])
-        if match:
-            word = match.group(1)
-
         new_entry = {
-            "project": word,
+            "project": project_name(usr_time["project"]),
             "title": usr_time["title"],
             "description": usr_time["step_to_record"],
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "duration": f"{hours}:{mins:02d}:{secs:02d}"
         }
 
-        # Append new activity entry and save
-        data.append(new_entry)
-        with open(ACTIVITY_FILE, "w", encoding="utf-8") as file:
-            json.dump(data, file, indent=4, ensure_ascii=False)
+        # Record the new activity entry with the storage backend
+        get_backend().append_activity(new_entry)
+        notify_activity(new_entry)
         print("✅ Activity logged.")
     except Exception as e:
         print(f"Unexpected error during activity logging: {e}")
 
 
-def add_context(usr_inp, task_index):
+def prepare_add_context(usr_inp, task_index=None, task_id=None):
     """
-    Update a 'dev' category task by adding user-provided context and refreshing its breakdown.
+    Build the LLM request for refreshing a 'dev' task's breakdown with new context.
 
     Parameters:
     usr_inp (str): User input providing additional context to update the task.
     task_index (int): Index of the 'dev' task to update, relative to all 'dev' tasks.
-    """
-    try:
-        with open(TASKS_FILE, 'r', encoding='utf-8') as file:
-            json_data = json.load(file)
-    except FileNotFoundError:
-        print(f"Error: File not found at {TASKS_FILE}")
-        return
-
-    # Find all dev tasks and their indices in the full list
-    dev_task_indices = [i for i, task in enumerate(json_data) if task.get("category") == "dev"]
-
-    # Validate the provided index
-    if task_index >= len(dev_task_indices):
-        print(f"Error: task_index {task_index} out of range for dev tasks.")
-        return
-
-    full_list_index = dev_task_indices[task_index]
-    dev_task = json_data[full_list_index]
+    task_id (str or None): Persistent ID of the task; takes precedence over task_index.
 
-    rule = (
-        "When modifying or updating the task breakdown, always respond with a JSON object "
-        "that includes the updated title, description, steps, and estimated total time. "
-        "Each step should be under 100 characters. The JSON must accurately reflect any context changes provided by the user."
-    )
-
-    # Prepare input for GPT API with existing task data plus new context
-    ai_inp = "Task Input: " + str(dev_task) + "\nContext Input: " + usr_inp
+    Returns:
+    dict or None: The request, or None if the task was not found.
+    """
+    store = get_store(TASKS_FILE)
+    dev_task = _resolve_dev_task(store, task_index, task_id)
+    if dev_task is None:
+        return None
+
+    # Prepare input for GPT API with the task's prompt fields plus new context
+    ai_inp = "Task Input: " + compact_json(task_prompt(dev_task)) + "\nContext Input: " + usr_inp
+    return {
+        "operation": "add_context",
+        "tasks_file": TASKS_FILE,
+        "input": ai_inp,
+        "rule": ADD_CONTEXT_RULE,
+        "task_id": dev_task['id'],
+    }
 
-    new_task_breakdown_str = gpt_api_call(ai_inp, rule)
 
-    if not new_task_breakdown_str:
-        print("Error: The response from gpt_api_call is empty or None.")
-        return
+def apply_add_context(request, result):
+    """
+    Replace the task with the updated breakdown from the LLM response.
 
-    # Clean the response string to prepare for JSON parsing
-    new_task_breakdown_str = new_task_breakdown_str.strip().replace('`', '')
-    new_task_breakdown_str = re.sub(r'^\s*json\s*', '', new_task_breakdown_str).strip()
+    Parameters:
+    request (dict): Request from prepare_add_context.
+    result (dict): Parse result from request_completion.
 
-    try:
-        new_task_breakdown = json.loads(new_task_breakdown_str)
-    except json.JSONDecodeError as e:
-        print(f"Error: Failed to parse response as JSON. {e}")
-        return
+    Returns:
+    bool: True if the task was updated.
+    """
+    new_task_breakdown = result["data"]
+    if new_task_breakdown is None:
+        return False
 
-    # Extract step descriptions, handling both dict and string formats
-    raw_steps = new_task_breakdown.get("steps", [])
-    if raw_steps and isinstance(raw_steps[0], dict):
-        step_descriptions = [step.get("description", "") for step in raw_steps]
-    else:
-        step_descriptions = raw_steps
+    store = get_store(request["tasks_file"])
+    dev_task = _resolve_dev_task(store, None, request["task_id"])
+    if dev_task is None:
+        return False
 
-    # Build updated task dictionary, preserving some old fields
+    # Build updated task dictionary, preserving old fields the response left out
     updated_task = {
-        "title": new_task_breakdown.get("title", dev_task.get("title", "")),
-        "description": new_task_breakdown.get("description", dev_task.get("description", "")),
+        "title": new_task_breakdown["title"] or dev_task.get("title", ""),
+        "description": new_task_breakdown["description"] or dev_task.get("description", ""),
         "priority": dev_task.get("priority", 5),
-        "expectedTime": new_task_breakdown.get("estimatedTotalTime", dev_task.get("expectedTime", "1 hour")),
+        "expectedTime": new_task_breakdown["estimatedTotalTime"] or dev_task.get("expectedTime", "1 hour"),
         "elapsedTime": dev_task.get("elapsedTime", 0),
         "category": "dev",
-        "steps": [{"description": desc, "duration": 0} for desc in step_descriptions]
+        "steps": [{"description": desc, "duration": 0} for desc in new_task_breakdown["steps"]]
     }
 
-    # Replace old task with updated task in full task list
-    json_data[full_list_index] = updated_task
-
-    # Save updated list back to the tasks file
-    with open(TASKS_FILE, "w", encoding="utf-8") as file:
-        json.dump(json_data, file, indent=4, ensure_ascii=False)
+    # Replace old task with updated task in the store
+    store.replace(dev_task, updated_task)
 
     print("✅ Task updated in full list and saved.")
+    return True
+
 
+def add_context(usr_inp, task_index=None, task_id=None):
+    """
+    Update a 'dev' category task by adding user-provided context and refreshing its breakdown.
 
+    Parameters:
+    usr_inp (str): User input providing additional context to update the task.
+    task_index (int): Index of the 'dev' task to update, relative to all 'dev' tasks.
+    task_id (str or None): Persistent ID of the task; takes precedence over task_index.
+    """
+    request = prepare_add_context(usr_inp, task_index, task_id)
+    if request is not None:
+        apply_add_context(request, request_completion(request))
@@ -0,0 +1,103 @@
+import atexit
+import threading
+import time
+
+"""
+Background writer that takes file I/O off the Qt GUI thread.
+
+Callers describe pending work as a batch object per key (usually a file path) with
+a write() method. Repeated submissions for the same key are merged into the one
+pending batch, and the batch is written once its key has been quiet for
+DEBOUNCE_SECONDS (or has waited MAX_DELAY_SECONDS). Anything still pending is
+written when flush() is called, including automatically at interpreter exit.
+"""
+
+DEBOUNCE_SECONDS = 0.25
+MAX_DELAY_SECONDS = 1.0
+
+_writer = None
+
+
+def get_writer():
+    """Return the process-wide background writer, starting it on first use."""
+    global _writer
+    if _writer is None:
+        _writer = BackgroundWriter()
+        atexit.register(_writer.flush)
+    return _writer
+
+
+class BackgroundWriter(threading.Thread):
+    """Daemon thread that debounces, coalesces and performs pending writes."""
+
+    def __init__(self):
+        super().__init__(name="PrismWriter", daemon=True)
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._pending = {}  # key -> [batch, first submit time, last submit time]
+        self.start()
+
+    def submit(self, key, factory, update):
+        """
+        Merge a change into the pending batch for a key.
+
+        Parameters:
+        key (str): What the batch writes to, usually a file path.
+        factory (callable): Creates an empty batch when none is pending.
+        update (callable): Called with the pending batch to merge the change into it.
+        """
+        with self._cond:
+            now = time.monotonic()
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = [factory(), now, now]
+            entry[2] = now
+            update(entry[0])
+            self._cond.notify()
+
+    def flush(self, key=None):
+        """
+        Write pending batches now, on the calling thread.
+
+        Parameters:
+        key (str or None): Only flush this key; flush everything if None.
+        """
+        with self._io_lock:
+            with self._cond:
+                keys = list(self._pending) if key is None else [key]
+                batches = [self._pending.pop(k)[0] for k in keys if k in self._pending]
+            for batch in batches:
+                self._write(batch)
+
+    def run(self):
+        while True:
+            with self._cond:
+                due, wait = self._due_keys()
+                while not due:
+                    self._cond.wait(wait)
+                    due, wait = self._due_keys()
+
+            with self._io_lock:
+                with self._cond:
+                    batches = [self._pending.pop(k)[0] for k in due if k in self._pending]
+                for batch in batches:
+                    self._write(batch)
+
+    def _due_keys(self):
+        """Return the keys ready to write and how long to wait for the next one."""
+        now = time.monotonic()
+        due, wait = [], None
+        for key, (_, first, last) in self._pending.items():
+            ready_at = min(last + DEBOUNCE_SECONDS, first + MAX_DELAY_SECONDS)
+            if ready_at <= now:
+                due.append(key)
+            elif wait is None or ready_at - now < wait:
+                wait = ready_at - now
+        return due, wait
+
+    def _write(self, batch):
+        """Write a batch, reporting rather than raising errors on the writer thread."""
+        try:
+            batch.write()
+        except Exception as e:
+            print(f"Error: background write failed: {e}")
@@ -0,0 +1,222 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+"""
+Latency benchmark of the LLM-backed task operations against the local mock server.
+
+For each project size, a synthetic project is generated in a temporary directory
+and every operation (create, expand, combine, add step, add context, plus a
+streamed create) is run several times through its prepare / completion / apply
+steps. The medians are reported in milliseconds:
+
+- load:    reading and indexing the project file;
+- prepare: resolving the task and building the prompt;
+- call:    the API round trip to the mock server, including schema validation;
+- parse:   schema validation alone, of the same canned response;
+- apply:   updating the in-memory task store;
+- write:   flushing the queued journal writes to disk;
+- total:   prepare + call + apply + write.
+
+Run with e.g. `python benchmark.py --sizes 10 100 1000 10000 --latency 0.05`.
+Nothing under data/ is read or written, and the response cache is disabled.
+"""
+
+os.environ["PRISM_LLM_CACHE"] = "off"
+
+from backend import LLM_API, Tasks
+from backend.MockServer import MockLLMServer, canned_response
+from backend.Responses import parse_response
+from backend.Storage import JsonBackend, SqliteBackend, set_backend
+from backend.TaskStore import TaskStore, get_store
+from backend.Writer import get_writer
+
+STEPS_PER_TASK = 5
+
+
+def make_project(path, size):
+    """Write a project with `size` tasks spread over the three categories."""
+    categories = ("idea", "dev", "rlty")
+    tasks = [
+        {
+            "title": f"Task {i}",
+            "description": f"Synthetic task number {i} for benchmarking",
+            "priority": 5,
+            "expectedTime": "1 hour",
+            "elapsedTime": 0,
+            "category": categories[i % len(categories)],
+            "steps": [{"description": f"Step {j} of task {i}", "duration": 0} for j in range(STEPS_PER_TASK)],
+        }
+        for i in range(size)
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(tasks, f, indent=4)
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def run_operation(prepare, apply):
+    """Run one operation step by step and return its timings, or None if nothing was prepared."""
+    start = time.perf_counter()
+    request = prepare()
+    prepared = time.perf_counter()
+    if request is None:
+        return None
+
+    result = Tasks.request_completion(request)
+    called = time.perf_counter()
+
+    # Validation alone, on the response the mock server gives for this request
+    raw = canned_response([
+        {"role": "system", "content": request["rule"]},
+        {"role": "user", "content": LLM_API._serialize_input(request["input"])},
+    ])
+    parse_start = time.perf_counter()
+    parse_response(request["operation"], raw)
+    parse_time = time.perf_counter() - parse_start
+
+    apply_start = time.perf_counter()
+    apply(request, result)
+    applied = time.perf_counter()
+    get_writer().flush()
+    written = time.perf_counter()
+
+    return {
+        "prepare": prepared - start,
+        "call": called - prepared,
+        "parse": parse_time,
+        "apply": applied - apply_start,
+        "write": written - applied,
+        "total": (prepared - start) + (called - prepared) + (written - apply_start),
+    }
+
+
+def run_stream(prepare, apply_event):
+    """Run a streamed operation and return its timings, including the time to the first step."""
+    start = time.perf_counter()
+    request = prepare()
+    first_item = None
+    apply_time = 0.0
+    for event in Tasks.stream_completion(request):
+        if event[0] == "item" and first_item is None:
+            first_item = time.perf_counter() - start
+        apply_start = time.perf_counter()
+        apply_event(request, event)
+        apply_time += time.perf_counter() - apply_start
+    write_start = time.perf_counter()
+    get_writer().flush()
+    end = time.perf_counter()
+    return {"first step": first_item or 0.0, "apply": apply_time, "write": end - write_start, "total": end - start}
+
+
+def benchmark_size(directory, size, repeat, storage):
+    """Benchmark every operation on a project of `size` tasks; return {operation: median timings}."""
+    tasks_file = os.path.join(directory, f"Bench{size}_Task_Data.json")
+    make_project(tasks_file, size)
+    if storage == "sqlite":
+        set_backend(SqliteBackend(os.path.join(directory, f"bench{size}.db")))
+    else:
+        set_backend(JsonBackend(activity_dir=os.path.join(directory, "activity")))
+
+    # The first load assigns IDs and rewrites the file; time a load of the migrated project
+    get_store(tasks_file)
+    get_writer().flush()
+    load_start = time.perf_counter()
+    TaskStore(tasks_file)
+    results = {"load": {"total": time.perf_counter() - load_start}}
+
+    Tasks.set_tasks_file(tasks_file)
+    store = get_store(tasks_file)
+    dev_tasks = store.category("dev")
+
+    def target(i):
+        return dev_tasks[i % len(dev_tasks)]
+
+    operations = {
+        "create_task": (lambda i: Tasks.prepare_create_task(f"Benchmark idea {i}"), Tasks.apply_create_task),
+        "expand_step": (lambda i: Tasks.prepare_expand_step({"step_id": target(i)["steps"][0]["id"]}),
+                        Tasks.apply_expand_step),
+        "combine_steps": (lambda i: Tasks.prepare_combine_steps({
+            "task_id": target(i)["id"],
+            "step_ids": [step["id"] for step in target(i)["steps"][:2]],
+        }), Tasks.apply_combine_steps),
+        "add_step": (lambda i: Tasks.prepare_add_step(f"Benchmark step {i}", task_id=target(i)["id"]),
+                     Tasks.apply_add_step),
+        "add_context": (lambda i: Tasks.prepare_add_context(f"Benchmark context {i}", task_id=target(i)["id"]),
+                        Tasks.apply_add_context),
+    }
+
+    for name, (prepare, apply) in operations.items():
+        runs = [run_operation(lambda: prepare(i), apply) for i in range(repeat)]
+        results[name] = _medians([run for run in runs if run is not None])
+
+    runs = [
+        run_stream(lambda: Tasks.prepare_create_task(f"Streamed idea {i}"), Tasks.apply_create_task_event)
+        for i in range(repeat)
+    ]
+    results["create_task (stream)"] = _medians(runs)
+    return results
+
+
+def _medians(runs):
+    if not runs:
+        return {}
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+def print_results(size, results):
+    columns = ("prepare", "call", "parse", "apply", "write", "first step", "total")
+    print(f"\n{size} tasks (load {_ms(results['load']['total']):.2f} ms)")
+    print(f"{'operation':<22}" + "".join(f"{column:>11}" for column in columns))
+    for name, timings in results.items():
+        if name == "load":
+            continue
+        cells = "".join(f"{_ms(timings[column]):>11.2f}" if column in timings else f"{'':>11}" for column in columns)
+        print(f"{name:<22}{cells}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the task operations against the mock LLM server.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000], help="project sizes in tasks")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per operation and size")
+    parser.add_argument("--latency", type=float, default=0.0, help="mock server delay per response, seconds")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="mock server delay between streamed chunks")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of malformed mock responses")
+    parser.add_argument("--storage", choices=("json", "sqlite"), default="json")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    args = parser.parse_args()
+
+    server = MockLLMServer(latency=args.latency, chunk_delay=args.chunk_delay,
+                           malformed_rate=args.malformed_rate, seed=0).start()
+    LLM_API.configure_client(server.url, api_key="mock")
+    directory = tempfile.mkdtemp(prefix="prism-bench-")
+
+    # Per-call token estimates would drown the tables
+    stdout = sys.stdout
+    all_results = {}
+    try:
+        for size in args.sizes:
+            sys.stdout = open(os.devnull, "w")
+            try:
+                results = benchmark_size(directory, size, args.repeat, args.storage)
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+            print_results(size, results)
+            all_results[size] = {name: {k: _ms(v) for k, v in timings.items()} for name, timings in results.items()}
+    finally:
+        sys.stdout = stdout
+        server.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"\n{server.requests} mock requests served")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(all_results, f, indent=4)
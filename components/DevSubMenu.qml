@@ -91,13 +91,7 @@ Rectangle {
             onClicked: {
                 stepTimer.stop()
                 Qt.callLater(function() {
-                    let menuDetails = menuBackend.getCurrentMenuDetails("dev")
-                    menuBackend.recordStepTime(
-                        stepData.description,
-                        elapsedSeconds,
-                        menuDetails.title,
-                        menuDetails.description
-                    )
+                    menuBackend.recordStepTimeById(stepData.id, elapsedSeconds)
                 })
             }
             cursorShape: Qt.PointingHandCursor
@@ -149,6 +143,7 @@ Rectangle {
         stepItem.selectedParentTitle = menuDetails.title
         stepItem.selectedParentDescription = menuDetails.description
         contextSubMenu.stepData = stepData
+        contextSubMenu.parentId = menuDetails.id
         contextSubMenu.parentTitle = menuDetails.title
         contextSubMenu.parentDescription = menuDetails.description
         contextSubMenu.x = mouse.x
@@ -159,6 +154,7 @@ Rectangle {
     Menu {
         id: contextSubMenu
         property var stepData
+        property string parentId
         property string parentTitle
         property string parentDescription
 
@@ -166,15 +162,15 @@ Rectangle {
             id: combineSteps
             text: "Combine"
             onTriggered: {
-                let descriptions = []
+                let stepIds = []
                 let stepData = menuBackend.SubMenuItems
                 for (let i = 0; i < submenuList.selectedIndices.length; i++) {
                     let stepIndex = submenuList.selectedIndices[i]
                     if (stepIndex >= 0 && stepIndex < stepData.length) {
-                        descriptions.push(stepData[stepIndex].description)
+                        stepIds.push(stepData[stepIndex].id)
                     }
                 }
-                menuBackend.combineSteps(descriptions, contextSubMenu.parentTitle, contextSubMenu.parentDescription)
+                menuBackend.combineStepsById(stepIds, contextSubMenu.parentId)
             }
         }
 
@@ -182,11 +178,20 @@ Rectangle {
             id: expandStep
             text: "Expand"
             onTriggered: {
-                menuBackend.expandStep(
-                    contextSubMenu.stepData.description,
-                    contextSubMenu.parentTitle,
-                    contextSubMenu.parentDescription
-                );
+                // Several selected steps are expanded together in one batch
+                if (submenuList.selectedIndices.length > 1) {
+                    let stepIds = []
+                    let stepData = menuBackend.SubMenuItems
+                    for (let i = 0; i < submenuList.selectedIndices.length; i++) {
+                        let stepIndex = submenuList.selectedIndices[i]
+                        if (stepIndex >= 0 && stepIndex < stepData.length) {
+                            stepIds.push(stepData[stepIndex].id)
+                        }
+                    }
+                    menuBackend.expandStepsById(stepIds, contextSubMenu.parentId)
+                } else {
+                    menuBackend.expandStepById(contextSubMenu.stepData.id);
+                }
             }
         }
 
@@ -194,11 +199,7 @@ Rectangle {
             id: deleteStep
             text: "Delete"
             onTriggered: {
-                menuBackend.deleteStep(
-                    contextSubMenu.stepData.description,
-                    contextSubMenu.parentTitle,
-                    contextSubMenu.parentDescription
-                );
+                menuBackend.deleteStepById(contextSubMenu.stepData.id);
             }
         }
     }